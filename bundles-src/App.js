@@ -62,6 +62,11 @@ class App extends Component {
 
     let csrfToken = document.querySelector("[name=csrfmiddlewaretoken]").value;
 
+    // Повторная отправка той же корзины не должна создавать второй заказ
+    if (!this.orderIdempotencyKey){
+      this.orderIdempotencyKey = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    }
+
     try {
       let response = await fetch(url, {
         method: 'post',
@@ -69,6 +74,7 @@ class App extends Component {
           'Accept': 'application/json',
           'Content-Type': 'application/json',
           'X-CSRFToken': csrfToken,
+          'Idempotency-Key': this.orderIdempotencyKey,
         },
         body: JSON.stringify(data),
       });
@@ -78,6 +84,7 @@ class App extends Component {
         return;
       }
       let responseData = await response.json();
+      this.orderIdempotencyKey = null;
 
       this.setState({
         cart: [],
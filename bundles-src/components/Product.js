@@ -39,13 +39,17 @@ class Product extends Component{
 
   render(){
     let image = this.props.product.image;
+    let thumbnail = (this.props.product.thumbnails || {}).medium || {};
     let name = this.props.product.name;
     let price = this.props.product.price;
     let id = this.props.product.id;
     return (
       <div className="product">
         <div className="product-image">
-          <img src={image} alt={name} onClick={this.quickView.bind(this)}/>
+          <picture>
+            {thumbnail.webp && <source srcSet={thumbnail.webp} type="image/webp"/>}
+            <img src={thumbnail.jpeg || image} alt={name} onClick={this.quickView.bind(this)}/>
+          </picture>
         </div>
         <h4 className="product-name">{name}</h4>
         <p className="product-price currency">{price}</p>
@@ -0,0 +1,66 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_address(address):
+    """Приводит адрес к ключу кеша: регистр, ё, пунктуация и пробелы не влияют на результат."""
+    address = address.casefold().replace('ё', 'е')
+    address = PUNCTUATION_RE.sub(' ', address)
+    return WHITESPACE_RE.sub(' ', address).strip()
+
+
+class CoordinateCache:
+    """LRU-кеш координат с TTL поверх индексированного поиска в таблице Coordinate."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, address):
+        key = normalize_address(address)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None:
+                coordinate, expires_at = cached
+                if expires_at > now:
+                    self._items.move_to_end(key)
+                    return coordinate
+                del self._items[key]
+
+        from .models import Coordinate
+        coordinate = Coordinate.objects.filter(normalized_address=key).first()
+        if coordinate is not None:
+            self.set(coordinate)
+        return coordinate
+
+    def set(self, coordinate):
+        with self._lock:
+            self._items[coordinate.normalized_address] = (coordinate, time.monotonic() + self.ttl)
+            self._items.move_to_end(coordinate.normalized_address)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, address):
+        with self._lock:
+            self._items.pop(normalize_address(address), None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+coordinate_cache = CoordinateCache(
+    maxsize=settings.COORDINATE_CACHE_SIZE,
+    ttl=settings.COORDINATE_CACHE_TTL
+)
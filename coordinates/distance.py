@@ -0,0 +1,42 @@
+from math import asin, cos, radians, sin, sqrt
+
+from django.conf import settings
+from geopy import distance
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _haversine_matrix(origins, destinations):
+    destinations = [(radians(lat), radians(lon), cos(radians(lat))) for lat, lon in destinations]
+    matrix = []
+    for lat, lon in origins:
+        lat, lon = radians(lat), radians(lon)
+        cos_lat = cos(lat)
+        row = []
+        for dest_lat, dest_lon, dest_cos_lat in destinations:
+            h = sin((dest_lat - lat) / 2) ** 2 + cos_lat * dest_cos_lat * sin((dest_lon - lon) / 2) ** 2
+            row.append(2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(h))))
+        matrix.append(row)
+    return matrix
+
+
+def _geodesic_matrix(origins, destinations):
+    return [
+        [distance.distance(origin, destination).km for destination in destinations]
+        for origin in origins
+    ]
+
+
+DISTANCE_METHODS = {
+    'haversine': _haversine_matrix,
+    'geodesic': _geodesic_matrix,
+}
+
+
+def distance_matrix(origins, destinations, method=None):
+    """Расстояния в км между каждой парой точек (lat, lon): matrix[i][j] — от origins[i] до destinations[j].
+
+    haversine считает по сфере с погрешностью до 0.5%, geodesic — точно по эллипсоиду, но заметно медленнее.
+    """
+    return DISTANCE_METHODS[method or settings.DISTANCE_METHOD](origins, destinations)
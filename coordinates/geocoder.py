@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+from django.dispatch import Signal
+from django.utils.module_loading import import_string
+
+from .cache import normalize_address
+
+
+geocoder_called = Signal()
+
+
+class GeocoderStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.found = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    def record(self, seconds, found=False, error=False):
+        with self._lock:
+            self.requests += 1
+            self.found += found
+            self.errors += error
+            self.total_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'found': self.found,
+                'errors': self.errors,
+                'hit_rate': self.found / self.requests if self.requests else None,
+                'avg_latency_ms': self.total_seconds / self.requests * 1000 if self.requests else None,
+            }
+
+
+class Geocoder:
+    """Базовый геокодер: по адресу возвращает (lon, lat) или None, если адрес не найден."""
+
+    def __init__(self):
+        self.stats = GeocoderStats()
+
+    def fetch_coordinates(self, address):
+        raise NotImplementedError
+
+    def geocode(self, address):
+        started_at = time.perf_counter()
+        try:
+            coords = self.fetch_coordinates(address)
+        except Exception:
+            self.record(time.perf_counter() - started_at, error=True)
+            raise
+        self.record(time.perf_counter() - started_at, found=coords is not None)
+        return coords
+
+    def record(self, seconds, **kwargs):
+        self.stats.record(seconds, **kwargs)
+        geocoder_called.send(sender=self.__class__, seconds=seconds)
+
+
+class YandexGeocoder(Geocoder):
+    base_url = 'https://geocode-maps.yandex.ru/1.x'
+
+    def __init__(self, apikey=None, timeout=5, pool_size=10):
+        super().__init__()
+        self.apikey = apikey or settings.YANDEX_APIKEY
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+    def fetch_coordinates(self, address):
+        """Ошибки сети, 429 и 5xx не глотаются, а пробрасываются: None значит только «адрес не найден»."""
+        response = self.session.get(self.base_url, params={
+            'geocode': address,
+            'apikey': self.apikey,
+            'format': 'json',
+        }, timeout=self.timeout)
+        response.raise_for_status()
+        found_places = response.json()['response']['GeoObjectCollection']['featureMember']
+
+        if not found_places:
+            return None
+
+        most_relevant = found_places[0]
+        lon, lat = most_relevant['GeoObject']['Point']['pos'].split(' ')
+        return float(lon), float(lat)
+
+
+class FakeGeocoder(Geocoder):
+    """Локальная замена геокодеру для тестов: точка в пределах Москвы, зависящая только от адреса."""
+
+    def fetch_coordinates(self, address):
+        digest = hashlib.sha1(normalize_address(address).encode()).digest()
+        lon = 37.35 + digest[0] / 255 * 0.5
+        lat = 55.55 + digest[1] / 255 * 0.35
+        return round(lon, 6), round(lat, 6)
+
+
+class FileGeocoder(Geocoder):
+    """Геокодер по JSON-файлу вида {"адрес": [lon, lat], ...}."""
+
+    def __init__(self, path):
+        super().__init__()
+        with open(path, encoding='utf-8') as file:
+            self.places = {
+                normalize_address(address): tuple(coords)
+                for address, coords in json.load(file).items()
+            }
+
+    def fetch_coordinates(self, address):
+        return self.places.get(normalize_address(address))
+
+
+def load_geocoder(backend, options=None):
+    return import_string(backend)(**(options or {}))
+
+
+@lru_cache(maxsize=None)
+def get_geocoder():
+    return load_geocoder(settings.GEOCODER_BACKEND, settings.GEOCODER_OPTIONS)
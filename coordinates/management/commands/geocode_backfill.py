@@ -0,0 +1,85 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from coordinates.cache import normalize_address
+from coordinates.geocoder import get_geocoder, load_geocoder
+from coordinates.models import Coordinate
+from coordinates.ratelimit import TokenBucket
+from foodcartapp.models import Order, Restaurant
+from foodcartapp.versions import RESTAURANT_VERSION, bump_version
+
+
+FAILED = object()
+
+
+class Command(BaseCommand):
+    help = 'Геокодирует рестораны и адреса заказов, для которых ещё нет координат'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='число параллельных запросов к геокодеру')
+        parser.add_argument('--rate', type=float, default=5, help='не больше запросов в секунду')
+        parser.add_argument('--retries', type=int, default=3, help='повторов при ошибке геокодера')
+        parser.add_argument('--backoff', type=float, default=1, help='начальная пауза между повторами, сек')
+        parser.add_argument('--backend', help='путь к классу геокодера вместо settings.GEOCODER_BACKEND')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        geocoder = load_geocoder(options['backend']) if options['backend'] else get_geocoder()
+        bucket = TokenBucket(options['rate'])
+
+        def geocode(address):
+            for attempt in range(options['retries'] + 1):
+                bucket.acquire()
+                try:
+                    return geocoder.geocode(address)
+                except Exception as error:
+                    if attempt == options['retries']:
+                        self.stderr.write(f'Не удалось геокодировать {address!r}: {error}')
+                        return FAILED
+                    time.sleep(options['backoff'] * 2 ** attempt)
+
+        restaurants = list(
+            Restaurant.objects
+            .exclude(address='')
+            .filter(Q(lat__isnull=True) | Q(lon__isnull=True))
+        )
+
+        known_addresses = set(Coordinate.objects.values_list('normalized_address', flat=True))
+        order_addresses = {}
+        for address in Order.objects.values_list('address', flat=True).distinct().iterator():
+            key = normalize_address(address)
+            if key not in known_addresses:
+                order_addresses.setdefault(key, address)
+
+        addresses = [restaurant.address for restaurant in restaurants] + list(order_addresses.values())
+        self.stdout.write(f'Ресторанов: {len(restaurants)}, адресов заказов: {len(order_addresses)}')
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            results = dict(zip(addresses, executor.map(geocode, addresses)))
+
+        for restaurant in restaurants:
+            coords = results[restaurant.address]
+            if coords and coords is not FAILED:
+                restaurant.lon, restaurant.lat = coords
+        Restaurant.objects.bulk_update(
+            [restaurant for restaurant in restaurants if restaurant.lat is not None and restaurant.lon is not None],
+            ['lat', 'lon'],
+            batch_size=options['batch_size']
+        )
+        bump_version(RESTAURANT_VERSION)
+
+        coordinates = []
+        for key, address in order_addresses.items():
+            coords = results[address]
+            if coords is FAILED:
+                continue
+            lon, lat = coords if coords else (None, None)
+            coordinates.append(Coordinate(address=address, normalized_address=key, lon=lon, lat=lat))
+        Coordinate.objects.bulk_create(coordinates, batch_size=options['batch_size'], ignore_conflicts=True)
+
+        found = sum(1 for coords in results.values() if coords and coords is not FAILED)
+        self.stdout.write(self.style.SUCCESS(f'Найдено координат: {found} из {len(results)}'))
+        self.stdout.write(f'Статистика геокодера: {geocoder.stats.snapshot()}')
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+def fill_normalized_addresses(apps, schema_editor):
+    from coordinates.cache import normalize_address
+
+    Coordinate = apps.get_model('coordinates', 'Coordinate')
+    coordinates = list(Coordinate.objects.all())
+    for coordinate in coordinates:
+        coordinate.normalized_address = normalize_address(coordinate.address)
+    Coordinate.objects.bulk_update(coordinates, ['normalized_address'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coordinates', '0003_alter_coordinate_address'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coordinate',
+            name='normalized_address',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100, verbose_name='нормализованный адрес'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_normalized_addresses, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .cache import normalize_address
+
 
 class Coordinate(models.Model):
     address = models.CharField(
@@ -7,6 +9,12 @@ class Coordinate(models.Model):
         max_length=100,
         unique=True
     )
+    normalized_address = models.CharField(
+        'нормализованный адрес',
+        max_length=100,
+        db_index=True,
+        editable=False
+    )
     lat = models.FloatField(
         'Координаты: широта',
         blank=True,
@@ -29,3 +37,7 @@ class Coordinate(models.Model):
 
     def __str__(self):
         return self.address
+
+    def save(self, *args, **kwargs):
+        self.normalized_address = normalize_address(self.address)
+        super().save(*args, **kwargs)
@@ -0,0 +1,18 @@
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import coordinate_cache
+from .geocoder import get_geocoder
+from .models import Coordinate
+
+
+@receiver([post_save, post_delete], sender=Coordinate)
+def invalidate_coordinate_cache(sender, instance, **kwargs):
+    coordinate_cache.invalidate(instance.address)
+
+
+@receiver(setting_changed)
+def reset_geocoder(sender, setting, **kwargs):
+    if setting in ('GEOCODER_BACKEND', 'GEOCODER_OPTIONS'):
+        get_geocoder.cache_clear()
@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .cache import coordinate_cache, normalize_address
+from .geocoder import get_geocoder
+from .models import Coordinate
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending_addresses = set()
+_failed_addresses = {}
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.GEOCODER_WORKERS,
+                thread_name_prefix='geocoder'
+            )
+        return _executor
+
+
+def geocode_address(address):
+    coords = get_geocoder().geocode(address)
+    lon, lat = coords if coords else (None, None)
+    coordinate, _ = Coordinate.objects.get_or_create(
+        normalized_address=normalize_address(address),
+        defaults={'address': address, 'lon': lon, 'lat': lat}
+    )
+    coordinate_cache.set(coordinate)
+    return coordinate
+
+
+def _geocode_or_log(address):
+    key = normalize_address(address)
+    try:
+        geocode_address(address)
+    except Exception:
+        logger.exception('Не удалось геокодировать адрес %r', address)
+        with _executor_lock:
+            _failed_addresses[key] = time.monotonic()
+    else:
+        with _executor_lock:
+            _failed_addresses.pop(key, None)
+
+
+def _run_in_background(address):
+    try:
+        _geocode_or_log(address)
+    finally:
+        with _executor_lock:
+            _pending_addresses.discard(normalize_address(address))
+        connection.close()
+
+
+def _submit(address):
+    key = normalize_address(address)
+    with _executor_lock:
+        failed_at = _failed_addresses.get(key)
+        if failed_at is not None and time.monotonic() - failed_at < settings.GEOCODER_RETRY_DELAY:
+            return
+        if key in _pending_addresses:
+            return
+        if settings.GEOCODER_ASYNC:
+            _pending_addresses.add(key)
+    if settings.GEOCODER_ASYNC:
+        _get_executor().submit(_run_in_background, address)
+    else:
+        _geocode_or_log(address)
+
+
+def enqueue_geocoding(address):
+    """Геокодирует адрес после коммита текущей транзакции, не задерживая её.
+
+    После ошибки геокодера адрес можно поставить в очередь снова не раньше чем через GEOCODER_RETRY_DELAY секунд.
+    """
+    transaction.on_commit(lambda: _submit(address))
@@ -1,17 +1,27 @@
-from collections import defaultdict
+import logging
 
-from django.contrib import admin
+import requests
+from django.contrib import admin, messages
 from django.shortcuts import reverse, redirect
 from django.templatetags.static import static
 from django.utils.html import format_html
 from django.utils.http import url_has_allowed_host_and_scheme
 
+from .assignment import assign_restaurants
+from .menu_index import get_capable_restaurants
+from .models import ArchivedOrder
+from .models import ArchivedOrderProduct
+from .models import ArchivedOrderStatusChange
 from .models import Order
 from .models import OrderProduct
 from .models import Product
 from .models import ProductCategory
 from .models import Restaurant
 from .models import RestaurantMenuItem
+from .thumbnails import thumbnail_url
+
+
+logger = logging.getLogger(__name__)
 
 
 class RestaurantMenuItemInline(admin.TabularInline):
@@ -25,6 +35,34 @@ class OrderProductInline(admin.TabularInline):
     readonly_fields = ('price',)
 
 
+class ArchivedOrderProductInline(admin.TabularInline):
+    model = ArchivedOrderProduct
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedOrderStatusChangeInline(admin.TabularInline):
+    model = ArchivedOrderStatusChange
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     inlines = [OrderProductInline]
@@ -38,11 +76,13 @@ class OrderAdmin(admin.ModelAdmin):
         'payment',
         'comment',
         'restaurant',
+        'total_price',
         'order_date',
         'call_date',
         'delivery_date'
     ]
-    readonly_fields = ('order_date',)
+    readonly_fields = ('order_date', 'total_price')
+    actions = ['assign_restaurants']
 
     def response_change(self, request, obj):
         next_url = request.GET.get('next')
@@ -51,21 +91,22 @@ class OrderAdmin(admin.ModelAdmin):
         else:
             return super().response_change(request, obj)
 
-    def get_form(self, request, obj=None, **kwargs):
-        order_menu = [product.id for product in obj.products.all()]
-        items = RestaurantMenuItem.objects.select_related('restaurant', 'product').filter(availability=True)
+    @admin.action(description='Назначить рестораны необработанным заказам')
+    def assign_restaurants(self, request, queryset):
+        assigned_orders = assign_restaurants(queryset)
+        self.message_user(request, f'Назначено заказов: {len(assigned_orders)}')
 
-        restaurant_menus = defaultdict(set)
-        for item in items:
-            restaurant_menus[item.restaurant.id].add(item.product.id)
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        form.instance.update_total_price()
+        form.instance.reset_candidates()
 
-        avalible_restaurants = [
-            restaurant_key for restaurant_key, restaurant_value in restaurant_menus.items()
-            if all([item in restaurant_value for item in order_menu])
-        ]
+    def get_form(self, request, obj=None, **kwargs):
+        order_menu = [product.id for product in obj.products.all()] if obj else []
+        avalible_restaurants = get_capable_restaurants(order_menu)
 
         form = super().get_form(request, obj, **kwargs)
-        form.base_fields['restaurant'].queryset = Restaurant.objects.filter(pk__in=avalible_restaurants )
+        form.base_fields['restaurant'].queryset = Restaurant.objects.filter(pk__in=avalible_restaurants)
         return form
 
 
@@ -86,7 +127,16 @@ class RestaurantAdmin(admin.ModelAdmin):
     ]
 
     def save_model(self, request, obj, form, change):
-        coords = obj.fetch_coordinates(obj.address)
+        try:
+            coords = obj.fetch_coordinates(obj.address)
+        except requests.RequestException as error:
+            logger.warning('Не удалось геокодировать ресторан %r: %s', obj.address, error)
+            self.message_user(
+                request,
+                'Геокодер недоступен, координаты ресторана не обновлены. Сохраните ресторан ещё раз позже.',
+                level=messages.WARNING
+            )
+            coords = None
         if coords:
             obj.lon, obj.lat = coords
         super().save_model(request, obj, form, change)
@@ -151,17 +201,36 @@ class ProductAdmin(admin.ModelAdmin):
     def get_image_preview(self, obj):
         if not obj.image:
             return 'выберите картинку'
-        return format_html('<img src="{url}" style="max-height: 200px;"/>', url=obj.image.url)
+        url = thumbnail_url(obj.image.name, 'medium') or obj.image.url
+        return format_html('<img src="{url}" style="max-height: 200px;"/>', url=url)
     get_image_preview.short_description = 'превью'
 
     def get_image_list_preview(self, obj):
         if not obj.image or not obj.id:
             return 'нет картинки'
         edit_url = reverse('admin:foodcartapp_product_change', args=(obj.id,))
-        return format_html('<a href="{edit_url}"><img src="{src}" style="max-height: 50px;"/></a>', edit_url=edit_url, src=obj.image.url)
+        src = thumbnail_url(obj.image.name, 'small') or obj.image.url
+        return format_html('<a href="{edit_url}"><img src="{src}" style="max-height: 50px;"/></a>', edit_url=edit_url, src=src)
     get_image_list_preview.short_description = 'превью'
 
 
 @admin.register(ProductCategory)
 class ProductAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    inlines = [ArchivedOrderProductInline, ArchivedOrderStatusChangeInline]
+    list_display = ['id', 'firstname', 'lastname', 'phonenumber', 'order_date', 'total_price']
+    search_fields = ['phonenumber', 'address']
+    date_hierarchy = 'order_date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
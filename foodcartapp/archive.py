@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import (
+    ArchivedOrder,
+    ArchivedOrderProduct,
+    ArchivedOrderStatusChange,
+    Order,
+    OrderProduct,
+    OrderStatusChange,
+)
+
+ARCHIVED_ORDER_FIELDS = [field.attname for field in ArchivedOrder._meta.concrete_fields if field.name != 'archived_at']
+ARCHIVED_PRODUCT_FIELDS = ['order_id', 'product_id', 'quantity', 'price']
+ARCHIVED_STATUS_CHANGE_FIELDS = ['order_id', 'from_status', 'status', 'changed_at', 'elapsed']
+
+
+def archivable_orders(before):
+    # Заказ могли вернуть в работу и завершить заново — считаем от последнего завершения
+    last_completed_at = (
+        OrderStatusChange.objects
+        .filter(order=OuterRef('pk'), status=Order.Completed)
+        .order_by('-changed_at')
+        .values('changed_at')[:1]
+    )
+    return (
+        Order.objects
+        .filter(status=Order.Completed)
+        .annotate(last_completed_at=Subquery(last_completed_at))
+        .filter(last_completed_at__lt=before)
+    )
+
+
+def archive_batch(order_ids, before):
+    with transaction.atomic():
+        orders = list(
+            archivable_orders(before)
+            .filter(pk__in=order_ids)
+            .select_for_update()
+            .values(*ARCHIVED_ORDER_FIELDS)
+        )
+        order_ids = [order['id'] for order in orders]
+        ArchivedOrder.objects.bulk_create(ArchivedOrder(**order) for order in orders)
+        ArchivedOrderProduct.objects.bulk_create(
+            ArchivedOrderProduct(**order_product)
+            for order_product in OrderProduct.objects.filter(order_id__in=order_ids).values(*ARCHIVED_PRODUCT_FIELDS)
+        )
+        ArchivedOrderStatusChange.objects.bulk_create(
+            ArchivedOrderStatusChange(**status_change)
+            for status_change in (
+                OrderStatusChange.objects
+                .filter(order_id__in=order_ids)
+                .order_by('id')
+                .values(*ARCHIVED_STATUS_CHANGE_FIELDS)
+            )
+        )
+        Order.objects.filter(pk__in=order_ids).delete()
+    return len(order_ids)
+
+
+def archive_orders(before, batch_size):
+    """Переносит завершённые до before заказы в архив пачками по batch_size, каждую в своей транзакции.
+
+    Возвращает генератор с числом перенесённых заказов в каждой пачке.
+    """
+    orders = archivable_orders(before).order_by('id').values_list('id', flat=True)
+    last_id = 0
+    while True:
+        order_ids = list(orders.filter(id__gt=last_id)[:batch_size])
+        if not order_ids:
+            return
+        last_id = order_ids[-1]
+        yield archive_batch(order_ids, before)
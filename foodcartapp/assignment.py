@@ -0,0 +1,60 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .dispatch import refresh_candidates
+from .models import Order
+
+
+def assign_restaurants(orders=None, capacity=None, dry_run=False):
+    """Назначает необработанным заказам рестораны за один проход.
+
+    Из всех пар «заказ — ресторан-кандидат» жадно берутся ближайшие, пока у ресторана
+    не кончится вместимость: не больше capacity незавершённых заказов одновременно.
+    Возвращает список назначенных заказов.
+    """
+    if capacity is None:
+        capacity = settings.DISPATCH_RESTAURANT_CAPACITY
+    if orders is None:
+        orders = Order.objects.all()
+
+    with transaction.atomic():
+        orders = list(
+            orders
+            .queue(Order.Raw)
+            .filter(restaurant__isnull=True)
+            .select_for_update()
+        )
+        refresh_candidates(orders, save=not dry_run)
+
+        load = Counter(
+            Order.objects
+            .filter(restaurant__isnull=False)
+            .exclude(status=Order.Completed)
+            .values_list('restaurant_id', flat=True)
+        )
+        edges = sorted(
+            (distance, order.id, restaurant_id)
+            for order in orders
+            if order.restaurant_candidates
+            for restaurant_id, distance in order.restaurant_candidates['restaurants']
+        )
+
+        orders_by_id = {order.id: order for order in orders}
+        assigned_orders = []
+        for _, order_id, restaurant_id in edges:
+            order = orders_by_id[order_id]
+            if order.restaurant_id is not None or load[restaurant_id] >= capacity:
+                continue
+            order.restaurant_id = restaurant_id
+            load[restaurant_id] += 1
+            assigned_orders.append(order)
+
+        if not dry_run:
+            now = timezone.now()
+            for order in assigned_orders:
+                order.updated_at = now
+            Order.objects.bulk_update(assigned_orders, ['restaurant', 'updated_at'])
+    return assigned_orders
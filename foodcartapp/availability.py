@@ -0,0 +1,46 @@
+from django.core.cache import cache
+
+from .models import Restaurant, RestaurantMenuItem
+from .versions import MENU_VERSION, RESTAURANT_VERSION, get_version
+
+
+class AvailabilityMatrix:
+    """Матрица «товар x ресторан»: для каждого товара битовая маска ресторанов, где он в продаже."""
+
+    def __init__(self, restaurants, product_masks):
+        self.restaurants = restaurants
+        self.columns = {restaurant.id: column for column, restaurant in enumerate(restaurants)}
+        self.product_masks = product_masks
+
+    @classmethod
+    def build(cls):
+        restaurants = list(Restaurant.objects.order_by('name').only('id', 'name'))
+        columns = {restaurant.id: column for column, restaurant in enumerate(restaurants)}
+        product_masks = {}
+        items = (
+            RestaurantMenuItem.objects
+            .filter(availability=True)
+            .values_list('product_id', 'restaurant_id')
+        )
+        for product_id, restaurant_id in items:
+            product_masks[product_id] = product_masks.get(product_id, 0) | 1 << columns[restaurant_id]
+        return cls(restaurants, product_masks)
+
+    def is_available(self, product_id, restaurant_id):
+        column = self.columns.get(restaurant_id)
+        if column is None:
+            return False
+        return bool(self.product_masks.get(product_id, 0) >> column & 1)
+
+    def row(self, product_id):
+        mask = self.product_masks.get(product_id, 0)
+        return (bool(mask >> column & 1) for column in range(len(self.restaurants)))
+
+
+def get_availability_matrix():
+    key = f'availability_matrix:{get_version(MENU_VERSION)}.{get_version(RESTAURANT_VERSION)}'
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = AvailabilityMatrix.build()
+        cache.set(key, matrix, timeout=None)
+    return matrix
@@ -0,0 +1,60 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Product
+from .thumbnails import thumbnail_urls
+from .versions import CATALOG_VERSION, get_version
+
+
+def dump_catalog():
+    products = Product.objects.select_related('category').available()
+
+    dumped_products = []
+    for product in products:
+        dumped_product = {
+            'id': product.id,
+            'name': product.name,
+            'price': product.price,
+            'special_status': product.special_status,
+            'description': product.description,
+            'category': {
+                'id': product.category.id,
+                'name': product.category.name,
+            } if product.category else None,
+            'image': product.image.url,
+            'thumbnails': thumbnail_urls(product.image.name),
+            'restaurant': {
+                'id': product.id,
+                'name': product.name,
+            }
+        }
+        dumped_products.append(dumped_product)
+    return dumped_products
+
+
+def get_catalog():
+    """Возвращает (etag, json-байты) каталога, пересобирая его только после изменения товаров или меню."""
+    key = f'catalog:{get_version(CATALOG_VERSION)}'
+    catalog = cache.get(key)
+    if catalog is None:
+        content = json.dumps(
+            dump_catalog(),
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+            separators=(',', ':')
+        ).encode()
+        catalog = (hashlib.md5(content).hexdigest(), content)
+        cache.set(key, catalog, timeout=None)
+    return catalog
+
+
+def get_product_ids():
+    key = f'product_ids:{get_version(CATALOG_VERSION)}'
+    product_ids = cache.get(key)
+    if product_ids is None:
+        product_ids = frozenset(Product.objects.values_list('id', flat=True))
+        cache.set(key, product_ids, timeout=None)
+    return product_ids
@@ -0,0 +1,89 @@
+from collections import defaultdict
+
+from django.conf import settings
+
+from coordinates.cache import normalize_address
+from coordinates.models import Coordinate
+
+from .menu_index import get_menu_index
+from .models import Order, OrderProduct
+from .spatial import get_restaurant_grid
+from .versions import MENU_VERSION, RESTAURANT_VERSION, get_version
+
+
+def get_dispatch_version():
+    return f'{get_version(MENU_VERSION)}.{get_version(RESTAURANT_VERSION)}'
+
+
+def compute_candidates(product_ids, lat, lon, menu_index=None, restaurant_grid=None):
+    """Рестораны, способные приготовить заказ, с расстоянием до клиента в км — от ближайшего."""
+    menu_index = menu_index or get_menu_index()
+    restaurant_grid = restaurant_grid or get_restaurant_grid()
+    nearest = restaurant_grid.nearest(
+        lat,
+        lon,
+        radius_km=settings.DISPATCH_RADIUS_KM,
+        restaurant_ids=menu_index.restaurants_for(product_ids)
+    )
+    return {
+        'lat': lat,
+        'lon': lon,
+        'restaurants': [[restaurant_id, round(distance, 2)] for restaurant_id, distance in nearest],
+    }
+
+
+def candidates_are_fresh(order, lat, lon, dispatch_version):
+    candidates = order.restaurant_candidates
+    return (
+        candidates is not None
+        and order.candidates_version == dispatch_version
+        and candidates['lat'] == lat
+        and candidates['lon'] == lon
+    )
+
+
+def get_order_coordinates(orders):
+    coordinates = Coordinate.objects.filter(
+        normalized_address__in={normalize_address(order.address) for order in orders}
+    )
+    return {coordinate.normalized_address: (coordinate.lat, coordinate.lon) for coordinate in coordinates}
+
+
+def refresh_candidates(orders, order_coordinates=None, save=True):
+    """Пересчитывает кандидатов только у заказов, где меню, рестораны или координаты клиента изменились.
+
+    С save=False новые кандидаты остаются только в объектах заказов и не записываются в базу.
+    """
+    if order_coordinates is None:
+        order_coordinates = get_order_coordinates(orders)
+    dispatch_version = get_dispatch_version()
+
+    stale_orders = []
+    for order in orders:
+        coords = order_coordinates.get(normalize_address(order.address))
+        if coords is None or None in coords:
+            continue
+        if not candidates_are_fresh(order, *coords, dispatch_version):
+            stale_orders.append((order, coords))
+    if not stale_orders:
+        return []
+
+    order_menus = defaultdict(list)
+    order_products = OrderProduct.objects.filter(
+        order__in=[order for order, _ in stale_orders]
+    ).values_list('order_id', 'product_id')
+    for order_id, product_id in order_products:
+        order_menus[order_id].append(product_id)
+
+    menu_index = get_menu_index()
+    restaurant_grid = get_restaurant_grid()
+    for order, (lat, lon) in stale_orders:
+        order.restaurant_candidates = compute_candidates(
+            order_menus[order.id], lat, lon, menu_index, restaurant_grid
+        )
+        order.candidates_version = dispatch_version
+
+    refreshed_orders = [order for order, _ in stale_orders]
+    if save:
+        Order.objects.bulk_update(refreshed_orders, ['restaurant_candidates', 'candidates_version'])
+    return refreshed_orders
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from foodcartapp.archive import archivable_orders, archive_orders
+
+
+class Command(BaseCommand):
+    help = 'Переносит давно завершённые заказы в архивные таблицы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', type=datetime.fromisoformat, help='дата, до которой заказ должен быть завершён, например 2024-01-31')
+        parser.add_argument('--days', type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS, help='архивировать заказы, завершённые больше чем столько дней назад')
+        parser.add_argument('--batch-size', type=int, default=settings.ORDER_ARCHIVE_BATCH_SIZE, help='сколько заказов переносить в одной транзакции')
+        parser.add_argument('--dry-run', action='store_true', help='только посчитать заказы, которые попадут в архив')
+
+    def handle(self, *args, **options):
+        before = options['before'] or timezone.now() - timedelta(days=options['days'])
+        if timezone.is_naive(before):
+            before = timezone.make_aware(before)
+
+        if options['dry_run']:
+            self.stdout.write(f'Заказов для архивации: {archivable_orders(before).count()}')
+            return
+
+        archived = 0
+        for batch_archived in archive_orders(before, options['batch_size']):
+            archived += batch_archived
+            self.stdout.write(f'Перенесено заказов: {archived}')
+        self.stdout.write(self.style.SUCCESS(f'В архив перенесено заказов: {archived}'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.assignment import assign_restaurants
+
+
+class Command(BaseCommand):
+    help = 'Назначает рестораны всем необработанным заказам с учётом расстояния и загрузки ресторанов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--capacity', type=int, help='сколько незавершённых заказов может быть у ресторана')
+        parser.add_argument('--dry-run', action='store_true', help='только показать назначения, не сохраняя их')
+
+    def handle(self, *args, **options):
+        assigned_orders = assign_restaurants(capacity=options['capacity'], dry_run=options['dry_run'])
+        for order in assigned_orders:
+            self.stdout.write(f'Заказ {order.id} -> ресторан {order.restaurant_id}')
+        self.stdout.write(self.style.SUCCESS(f'Назначено заказов: {len(assigned_orders)}'))
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from foodcartapp.models import Product
+from foodcartapp.serializers import OrderSerializer
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время проверки заказа OrderSerializer для корзин разного размера во временной БД'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100], help='число позиций в заказе')
+        parser.add_argument('--repeat', type=int, default=200, help='повторов на каждый размер')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_database_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Свой кеш, чтобы id временных товаров не попали в общий кеш рабочей базы
+            with override_settings(CACHES={
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'benchmark_order_validation',
+                },
+            }):
+                self.run_benchmarks(options)
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+            teardown_test_environment()
+
+    def run_benchmarks(self, options):
+        products = Product.objects.bulk_create([
+            Product(name=f'benchmark {number}', price=100, image='benchmark.jpg')
+            for number in range(max(options['sizes']))
+        ])
+
+        for size in options['sizes']:
+            order = {
+                'firstname': 'Иван',
+                'lastname': 'Петров',
+                'phonenumber': '+79001234567',
+                'address': 'Москва, Красная площадь, 1',
+                'products': [{'product': product.id, 'quantity': 1} for product in products[:size]],
+            }
+            OrderSerializer(data=order).is_valid(raise_exception=True)
+
+            with CaptureQueriesContext(connection) as queries:
+                started_at = time.perf_counter()
+                for _ in range(options['repeat']):
+                    OrderSerializer(data=order).is_valid(raise_exception=True)
+                elapsed = time.perf_counter() - started_at
+
+            self.stdout.write(
+                f'{size:>4} позиций: {elapsed / options["repeat"] * 1000:.3f} мс на заказ, '
+                f'{len(queries) / options["repeat"]:.1f} запросов к БД'
+            )
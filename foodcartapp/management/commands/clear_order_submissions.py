@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from foodcartapp.models import OrderSubmission
+
+
+class Command(BaseCommand):
+    help = 'Удаляет устаревшие ключи идемпотентности заказов'
+
+    def handle(self, *args, **options):
+        expires_at = timezone.now() - timedelta(seconds=settings.ORDER_IDEMPOTENCY_TTL)
+        deleted, _ = OrderSubmission.objects.filter(created_at__lt=expires_at).delete()
+        self.stdout.write(self.style.SUCCESS(f'Удалено ключей: {deleted}'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import Product
+from foodcartapp.thumbnails import generate_thumbnails, thumbnail_urls
+
+
+class Command(BaseCommand):
+    help = 'Готовит уменьшенные копии картинок товаров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='пересоздать уже существующие превью')
+
+    def handle(self, *args, **options):
+        image_names = set(Product.objects.exclude(image='').values_list('image', flat=True))
+        generated = 0
+        for image_name in sorted(image_names):
+            if not options['force'] and thumbnail_urls(image_name):
+                continue
+            try:
+                generate_thumbnails(image_name)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'Не удалось обработать {image_name}: {error}')
+                continue
+            generated += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано картинок: {generated}'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, Value
+from django.db.models.functions import Coalesce
+
+from foodcartapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые стоимости заказов по их позициям'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='только найти расхождения, ничего не меняя')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        orders = Order.objects.order_price().annotate(
+            actual_price=Coalesce('order_price', Value(0), output_field=DecimalField())
+        ).only('id', 'total_price')
+
+        mismatched = []
+        for order in orders.iterator(chunk_size=options['batch_size']):
+            if order.total_price != order.actual_price:
+                self.stdout.write(f'Заказ {order.id}: сохранено {order.total_price}, по позициям {order.actual_price}')
+                order.total_price = order.actual_price
+                mismatched.append(order)
+
+        if options['check']:
+            self.stdout.write(f'Расхождений: {len(mismatched)}')
+            return
+
+        with transaction.atomic():
+            Order.objects.bulk_update(mismatched, ['total_price'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Исправлено заказов: {len(mismatched)}'))
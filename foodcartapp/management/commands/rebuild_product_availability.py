@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import Product
+from foodcartapp.versions import CATALOG_VERSION, bump_version
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает флаг «в продаже хотя бы в одном ресторане» у всех товаров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--explain', action='store_true', help='показать план запроса доступных товаров')
+
+    def handle(self, *args, **options):
+        updated = Product.objects.update_availability()
+        bump_version(CATALOG_VERSION)
+        self.stdout.write(self.style.SUCCESS(f'Обновлено товаров: {updated}'))
+
+        if options['explain']:
+            self.stdout.write(Product.objects.available().explain())
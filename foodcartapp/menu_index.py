@@ -0,0 +1,54 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .models import RestaurantMenuItem
+from .versions import MENU_VERSION, get_version
+
+
+class MenuIndex:
+    """Инвертированный индекс меню: товар -> рестораны, где он в продаже."""
+
+    def __init__(self, product_restaurants):
+        self.product_restaurants = product_restaurants
+        self.restaurant_ids = frozenset().union(*product_restaurants.values())
+
+    @classmethod
+    def build(cls):
+        product_restaurants = defaultdict(set)
+        items = (
+            RestaurantMenuItem.objects
+            .filter(availability=True)
+            .values_list('product_id', 'restaurant_id')
+        )
+        for product_id, restaurant_id in items:
+            product_restaurants[product_id].add(restaurant_id)
+        return cls({
+            product_id: frozenset(restaurant_ids)
+            for product_id, restaurant_ids in product_restaurants.items()
+        })
+
+    def restaurants_for(self, product_ids):
+        menus = sorted(
+            (self.product_restaurants.get(product_id, frozenset()) for product_id in set(product_ids)),
+            key=len
+        )
+        restaurant_ids = set(self.restaurant_ids)
+        for menu in menus:
+            restaurant_ids &= menu
+            if not restaurant_ids:
+                break
+        return restaurant_ids
+
+
+def get_menu_index():
+    key = f'menu_index:{get_version(MENU_VERSION)}'
+    menu_index = cache.get(key)
+    if menu_index is None:
+        menu_index = MenuIndex.build()
+        cache.set(key, menu_index, timeout=None)
+    return menu_index
+
+
+def get_capable_restaurants(product_ids):
+    return get_menu_index().restaurants_for(product_ids)
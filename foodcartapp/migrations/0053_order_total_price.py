@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:17
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum
+
+
+def fill_total_prices(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    OrderProduct = apps.get_model('foodcartapp', 'OrderProduct')
+    totals = (
+        OrderProduct.objects
+        .filter(order=OuterRef('pk'))
+        .values('order')
+        .annotate(total=Sum(F('price') * F('quantity')))
+        .values('total')
+    )
+    Order.objects.filter(pk__in=OrderProduct.objects.values('order')).update(total_price=Subquery(totals))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0052_rename_phone_order_phonenumber'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='total_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, validators=[django.core.validators.MinValueValidator(0)], verbose_name='стоимость заказа'),
+        ),
+        migrations.RunPython(fill_total_prices, migrations.RunPython.noop),
+    ]
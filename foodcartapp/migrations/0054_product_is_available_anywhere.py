@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def fill_availability(apps, schema_editor):
+    Product = apps.get_model('foodcartapp', 'Product')
+    RestaurantMenuItem = apps.get_model('foodcartapp', 'RestaurantMenuItem')
+    available_items = RestaurantMenuItem.objects.filter(product=OuterRef('pk'), availability=True)
+    Product.objects.update(is_available_anywhere=Exists(available_items))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0053_order_total_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='is_available_anywhere',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='в продаже хотя бы в одном ресторане'),
+        ),
+        migrations.RunPython(fill_availability, migrations.RunPython.noop),
+    ]
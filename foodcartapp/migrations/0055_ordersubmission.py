@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0054_product_is_available_anywhere'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSubmission',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=64, unique=True, verbose_name='ключ идемпотентности')),
+                ('response', models.JSONField(verbose_name='ответ на запрос')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='дата и время запроса')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='foodcartapp.order', verbose_name='заказ')),
+            ],
+            options={
+                'verbose_name': 'отправка заказа',
+                'verbose_name_plural': 'отправки заказов',
+            },
+        ),
+    ]
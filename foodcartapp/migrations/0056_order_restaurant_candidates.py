@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0055_ordersubmission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='candidates_version',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='версия меню и ресторанов для кандидатов'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='restaurant_candidates',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='рестораны, способные приготовить заказ'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+STATUS_CODES = {
+    'Необработанный': 1,
+    'Готовится': 2,
+    'В пути': 3,
+    'Завершен': 4,
+}
+
+
+def fill_status_changes(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    OrderStatusChange = apps.get_model('foodcartapp', 'OrderStatusChange')
+    OrderStatusChange.objects.bulk_create(
+        (
+            OrderStatusChange(order_id=order_id, status=STATUS_CODES[status], changed_at=order_date)
+            for order_id, status, order_date in Order.objects.values_list('id', 'status', 'order_date').iterator()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0057_order_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Необработанный'), (2, 'Готовится'), (3, 'В пути'), (4, 'Завершен')], null=True, verbose_name='предыдущий статус')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Необработанный'), (2, 'Готовится'), (3, 'В пути'), (4, 'Завершен')], verbose_name='статус')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='дата и время изменения статуса')),
+                ('elapsed', models.DurationField(blank=True, null=True, verbose_name='время в предыдущем статусе')),
+            ],
+            options={
+                'verbose_name': 'смена статуса заказа',
+                'verbose_name_plural': 'смены статусов заказов',
+            },
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('Необработанный', 'Необработанный'), ('Готовится', 'Готовится'), ('В пути', 'В пути'), ('Завершен', 'Завершен')], default='Необработанный', max_length=25, verbose_name='статус заказа'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'order_date'], name='order_status_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['restaurant', 'status', 'order_date'], name='order_restaurant_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'Завершен'), _negated=True), fields=['order_date'], name='order_unprocessed_idx'),
+        ),
+        migrations.AddField(
+            model_name='orderstatuschange',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_changes', to='foodcartapp.order', verbose_name='заказ'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatuschange',
+            index=models.Index(fields=['order', 'changed_at'], name='status_change_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatuschange',
+            index=models.Index(fields=['status', 'changed_at'], name='status_change_status_idx'),
+        ),
+        migrations.RunPython(fill_status_changes, migrations.RunPython.noop),
+    ]
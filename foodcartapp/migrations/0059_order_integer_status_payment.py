@@ -0,0 +1,109 @@
+from django.db import migrations, models
+from django.db.models import Case, Q, Value, When
+
+STATUS_CODES = {
+    'Необработанный': 1,
+    'Готовится': 2,
+    'В пути': 3,
+    'Завершен': 4,
+}
+PAYMENT_CODES = {
+    'Наличностью': 1,
+    'Электронно': 2,
+}
+
+
+def convert(field, codes):
+    return Case(
+        *[When(**{field: value}, then=Value(code)) for value, code in codes.items()],
+        default=None
+    )
+
+
+def fill_codes(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    Order.objects.update(
+        status_code=convert('status', STATUS_CODES),
+        payment_code=convert('payment', PAYMENT_CODES)
+    )
+
+
+def fill_labels(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    Order.objects.update(
+        status=convert('status_code', {code: value for value, code in STATUS_CODES.items()}),
+        payment=convert('payment_code', {code: value for value, code in PAYMENT_CODES.items()})
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0058_orderstatuschange'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_status_queue_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_restaurant_queue_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_unprocessed_idx',
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='payment_code',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.RunPython(fill_codes, fill_labels),
+        migrations.RemoveField(
+            model_name='order',
+            name='status',
+        ),
+        migrations.RemoveField(
+            model_name='order',
+            name='payment',
+        ),
+        migrations.RenameField(
+            model_name='order',
+            old_name='status_code',
+            new_name='status',
+        ),
+        migrations.RenameField(
+            model_name='order',
+            old_name='payment_code',
+            new_name='payment',
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Необработанный'), (2, 'Готовится'), (3, 'В пути'), (4, 'Завершен')], default=1, verbose_name='статус заказа'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='payment',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Наличностью'), (2, 'Электронно')], db_index=True, default=2, verbose_name='способ оплаты'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'order_date'], name='order_status_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['restaurant', 'status', 'order_date'], name='order_restaurant_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=Q(('status', 4), _negated=True), fields=['order_date'], name='order_unprocessed_idx'),
+        ),
+    ]
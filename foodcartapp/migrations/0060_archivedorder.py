@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:33
+
+import django.db.models.deletion
+import phonenumber_field.modelfields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0059_order_integer_status_payment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False, verbose_name='номер заказа')),
+                ('firstname', models.CharField(max_length=25, verbose_name='имя клиента')),
+                ('lastname', models.CharField(max_length=25, verbose_name='фамилия клиента')),
+                ('phonenumber', phonenumber_field.modelfields.PhoneNumberField(db_index=True, max_length=128, region='RU', verbose_name='телефон клиента')),
+                ('address', models.CharField(max_length=100, verbose_name='адрес клиента')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Необработанный'), (2, 'Готовится'), (3, 'В пути'), (4, 'Завершен')], verbose_name='статус заказа')),
+                ('payment', models.PositiveSmallIntegerField(choices=[(1, 'Наличностью'), (2, 'Электронно')], verbose_name='способ оплаты')),
+                ('comment', models.CharField(blank=True, max_length=200, verbose_name='комментарий к заказу')),
+                ('order_date', models.DateTimeField(db_index=True, verbose_name='дата и время регистрации заказа')),
+                ('call_date', models.DateTimeField(blank=True, null=True, verbose_name='дата и время звонка')),
+                ('delivery_date', models.DateTimeField(blank=True, null=True, verbose_name='дата и время доставки')),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='стоимость заказа')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='дата и время архивации')),
+                ('restaurant', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to='foodcartapp.restaurant', verbose_name='ресторан')),
+            ],
+            options={
+                'verbose_name': 'архивный заказ',
+                'verbose_name_plural': 'архивные заказы',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderProduct',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveSmallIntegerField(verbose_name='количество')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='цена')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='products', to='foodcartapp.archivedorder', verbose_name='заказ')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_order_products', to='foodcartapp.product', verbose_name='товар')),
+            ],
+            options={
+                'verbose_name': 'элемент архивного заказа',
+                'verbose_name_plural': 'элементы архивных заказов',
+            },
+        ),
+    ]
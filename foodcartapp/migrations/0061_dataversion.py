@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0060_archivedorder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='название')),
+                ('version', models.BigIntegerField(verbose_name='версия')),
+            ],
+            options={
+                'verbose_name': 'версия данных',
+                'verbose_name_plural': 'версии данных',
+            },
+        ),
+    ]
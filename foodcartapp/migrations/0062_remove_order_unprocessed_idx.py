@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0061_dataversion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_unprocessed_idx',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0062_remove_order_unprocessed_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedorderproduct',
+            name='product',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_order_products', to='foodcartapp.product', verbose_name='товар'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderStatusChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Необработанный'), (2, 'Готовится'), (3, 'В пути'), (4, 'Завершен')], null=True, verbose_name='предыдущий статус')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Необработанный'), (2, 'Готовится'), (3, 'В пути'), (4, 'Завершен')], verbose_name='статус')),
+                ('changed_at', models.DateTimeField(verbose_name='дата и время изменения статуса')),
+                ('elapsed', models.DurationField(blank=True, null=True, verbose_name='время в предыдущем статусе')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_changes', to='foodcartapp.archivedorder', verbose_name='заказ')),
+            ],
+            options={
+                'verbose_name': 'смена статуса архивного заказа',
+                'verbose_name_plural': 'смены статусов архивных заказов',
+                'indexes': [models.Index(fields=['status', 'changed_at'], name='archived_status_change_idx')],
+            },
+        ),
+    ]
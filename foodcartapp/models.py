@@ -1,11 +1,11 @@
-import requests
-
-from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.db import models
-from django.db.models import Sum, F, ForeignKey
+from django.db.models import Avg, Count, Exists, F, ForeignKey, OuterRef, Q, Sum
+from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
+from coordinates.geocoder import get_geocoder
+
 
 class Restaurant(models.Model):
     name = models.CharField(
@@ -41,36 +41,19 @@ class Restaurant(models.Model):
         return self.name
 
     def fetch_coordinates(self, address):
-        apikey = settings.YANDEX_APIKEY
-        try:
-            base_url = "https://geocode-maps.yandex.ru/1.x"
-            response = requests.get(base_url, params={
-                "geocode": address,
-                "apikey": apikey,
-                "format": "json",
-            })
-            response.raise_for_status()
-            found_places = response.json()['response']['GeoObjectCollection']['featureMember']
-
-            if not found_places:
-                return None
-
-            most_relevant = found_places[0]
-            lon, lat = most_relevant['GeoObject']['Point']['pos'].split(" ")
-            return lon, lat
-        except requests.exceptions.HTTPError as error:
-            print(f'HTTPError: {error}')
-            return None
+        return get_geocoder().geocode(address)
 
 
 class ProductQuerySet(models.QuerySet):
     def available(self):
-        products = (
-            RestaurantMenuItem.objects
-            .filter(availability=True)
-            .values_list('product')
+        return self.filter(is_available_anywhere=True)
+
+    def update_availability(self):
+        available_items = RestaurantMenuItem.objects.filter(
+            product=OuterRef('pk'),
+            availability=True
         )
-        return self.filter(pk__in=products)
+        return self.update(is_available_anywhere=Exists(available_items))
 
 
 class OrderQuerySet(models.QuerySet):
@@ -78,6 +61,25 @@ class OrderQuerySet(models.QuerySet):
         orders = self.annotate(order_price=Sum(F('orderproduct__price') * F('orderproduct__quantity')))
         return orders
 
+    def unprocessed(self):
+        return (
+            self.exclude(status=self.model.Completed)
+            .order_by('status', 'order_date', 'id')
+        )
+
+    def queue(self, status, restaurant=None):
+        orders = self.filter(status=status)
+        if restaurant is not None:
+            orders = orders.filter(restaurant=restaurant)
+        return orders.order_by('order_date', 'id')
+
+    def after(self, status, order_date, order_id):
+        return self.filter(
+            Q(status__gt=status)
+            | Q(status=status, order_date__gt=order_date)
+            | Q(status=status, order_date=order_date, id__gt=order_id)
+        )
+
 
 class ProductCategory(models.Model):
     name = models.CharField(
@@ -125,6 +127,12 @@ class Product(models.Model):
         max_length=200,
         blank=True
     )
+    is_available_anywhere = models.BooleanField(
+        'в продаже хотя бы в одном ресторане',
+        default=False,
+        db_index=True,
+        editable=False
+    )
 
     objects = ProductQuerySet.as_manager()
 
@@ -167,18 +175,18 @@ class RestaurantMenuItem(models.Model):
 
 
 class Order(models.Model):
-    Raw = 'Необработанный'
-    Cooking = 'Готовится'
-    Transport = 'В пути'
-    Completed = 'Завершен'
+    Raw = 1
+    Cooking = 2
+    Transport = 3
+    Completed = 4
     ORDER_STATUS_CHOICES = [
         (Raw, 'Необработанный'),
         (Cooking, 'Готовится'),
         (Transport, 'В пути'),
         (Completed, 'Завершен')
     ]
-    Cash = 'Наличностью'
-    Electronic = 'Электронно'
+    Cash = 1
+    Electronic = 2
     PAYMENT_CHOICES = [
         (Cash, 'Наличностью'),
         (Electronic, 'Электронно')
@@ -204,12 +212,10 @@ class Order(models.Model):
         related_name='products',
         through='OrderProduct'
     )
-    status = models.CharField(
+    status = models.PositiveSmallIntegerField(
         'статус заказа',
-        max_length=25,
         choices=ORDER_STATUS_CHOICES,
-        default=Raw,
-        db_index=True
+        default=Raw
     )
     comment = models.CharField(
         'комментарий к заказу',
@@ -233,9 +239,12 @@ class Order(models.Model):
         blank=True,
         db_index=True
     )
-    payment = models.CharField(
+    updated_at = models.DateTimeField(
+        'дата и время изменения заказа',
+        auto_now=True
+    )
+    payment = models.PositiveSmallIntegerField(
         'способ оплаты',
-        max_length=25,
         choices=PAYMENT_CHOICES,
         default=Electronic,
         db_index=True
@@ -247,16 +256,51 @@ class Order(models.Model):
         null=True,
         on_delete=models.SET_NULL
     )
+    total_price = models.DecimalField(
+        'стоимость заказа',
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
+    restaurant_candidates = models.JSONField(
+        'рестораны, способные приготовить заказ',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    candidates_version = models.CharField(
+        'версия меню и ресторанов для кандидатов',
+        max_length=50,
+        blank=True,
+        editable=False
+    )
 
     objects = OrderQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'заказ'
         verbose_name_plural = 'заказы'
+        indexes = [
+            models.Index(fields=['status', 'order_date'], name='order_status_queue_idx'),
+            models.Index(fields=['restaurant', 'status', 'order_date'], name='order_restaurant_queue_idx'),
+        ]
 
     def __str__(self):
         return f'{self.firstname} {self.lastname} {self.address}'
 
+    def update_total_price(self):
+        total_price = self.orderproduct_set.aggregate(
+            total_price=Sum(F('price') * F('quantity'))
+        )['total_price']
+        self.total_price = total_price or 0
+        self.save(update_fields=['total_price', 'updated_at'])
+
+    def reset_candidates(self):
+        self.restaurant_candidates = None
+        self.candidates_version = ''
+        self.save(update_fields=['restaurant_candidates', 'candidates_version', 'updated_at'])
+
 
 class OrderProduct(models.Model):
     order = ForeignKey(
@@ -286,3 +330,266 @@ class OrderProduct(models.Model):
 
     def __str__(self):
         return f'{self.product.name} {self.order}'
+
+
+class OrderSubmission(models.Model):
+    idempotency_key = models.CharField(
+        'ключ идемпотентности',
+        max_length=64,
+        unique=True
+    )
+    order = models.ForeignKey(
+        Order,
+        verbose_name='заказ',
+        related_name='submissions',
+        on_delete=models.CASCADE
+    )
+    response = models.JSONField(
+        'ответ на запрос'
+    )
+    created_at = models.DateTimeField(
+        'дата и время запроса',
+        auto_now_add=True,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'отправка заказа'
+        verbose_name_plural = 'отправки заказов'
+
+    def __str__(self):
+        return self.idempotency_key
+
+
+class OrderStatusChangeQuerySet(models.QuerySet):
+    def stage_latencies(self):
+        return (
+            self.filter(elapsed__isnull=False)
+            .values('from_status', 'status')
+            .annotate(orders_count=Count('id'), avg_elapsed=Avg('elapsed'))
+            .order_by('from_status', 'status')
+        )
+
+
+class OrderStatusChange(models.Model):
+    STATUS_CHOICES = Order.ORDER_STATUS_CHOICES
+    order = models.ForeignKey(
+        Order,
+        verbose_name='заказ',
+        related_name='status_changes',
+        on_delete=models.CASCADE
+    )
+    from_status = models.PositiveSmallIntegerField(
+        'предыдущий статус',
+        choices=STATUS_CHOICES,
+        null=True,
+        blank=True
+    )
+    status = models.PositiveSmallIntegerField(
+        'статус',
+        choices=STATUS_CHOICES
+    )
+    changed_at = models.DateTimeField(
+        'дата и время изменения статуса',
+        default=timezone.now
+    )
+    elapsed = models.DurationField(
+        'время в предыдущем статусе',
+        null=True,
+        blank=True
+    )
+
+    objects = OrderStatusChangeQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'смена статуса заказа'
+        verbose_name_plural = 'смены статусов заказов'
+        indexes = [
+            models.Index(fields=['order', 'changed_at'], name='status_change_order_idx'),
+            models.Index(fields=['status', 'changed_at'], name='status_change_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.order_id}: {self.get_status_display()}'
+
+    @classmethod
+    def record(cls, order, previous_status=None):
+        changed_at = timezone.now()
+        previous_change = None
+        if previous_status is not None:
+            previous_change = (
+                cls.objects
+                .filter(order=order)
+                .order_by('-changed_at')
+                .values_list('changed_at', flat=True)
+                .first()
+            )
+        return cls.objects.create(
+            order=order,
+            from_status=previous_status,
+            status=order.status,
+            changed_at=changed_at,
+            elapsed=changed_at - previous_change if previous_change else None
+        )
+
+
+class ArchivedOrder(models.Model):
+    id = models.IntegerField(
+        'номер заказа',
+        primary_key=True
+    )
+    firstname = models.CharField(
+        'имя клиента',
+        max_length=25
+    )
+    lastname = models.CharField(
+        'фамилия клиента',
+        max_length=25
+    )
+    phonenumber = PhoneNumberField(
+        'телефон клиента',
+        region='RU',
+        db_index=True
+    )
+    address = models.CharField(
+        'адрес клиента',
+        max_length=100
+    )
+    status = models.PositiveSmallIntegerField(
+        'статус заказа',
+        choices=Order.ORDER_STATUS_CHOICES
+    )
+    payment = models.PositiveSmallIntegerField(
+        'способ оплаты',
+        choices=Order.PAYMENT_CHOICES
+    )
+    comment = models.CharField(
+        'комментарий к заказу',
+        max_length=200,
+        blank=True
+    )
+    order_date = models.DateTimeField(
+        'дата и время регистрации заказа',
+        db_index=True
+    )
+    call_date = models.DateTimeField(
+        'дата и время звонка',
+        null=True,
+        blank=True
+    )
+    delivery_date = models.DateTimeField(
+        'дата и время доставки',
+        null=True,
+        blank=True
+    )
+    restaurant = models.ForeignKey(
+        Restaurant,
+        verbose_name='ресторан',
+        related_name='archived_orders',
+        null=True,
+        on_delete=models.SET_NULL
+    )
+    total_price = models.DecimalField(
+        'стоимость заказа',
+        max_digits=10,
+        decimal_places=2
+    )
+    archived_at = models.DateTimeField(
+        'дата и время архивации',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'архивный заказ'
+        verbose_name_plural = 'архивные заказы'
+
+    def __str__(self):
+        return f'{self.firstname} {self.lastname} {self.address}'
+
+
+class ArchivedOrderProduct(models.Model):
+    order = models.ForeignKey(
+        ArchivedOrder,
+        verbose_name='заказ',
+        related_name='products',
+        on_delete=models.CASCADE
+    )
+    product = models.ForeignKey(
+        Product,
+        verbose_name='товар',
+        related_name='archived_order_products',
+        null=True,
+        on_delete=models.SET_NULL
+    )
+    quantity = models.PositiveSmallIntegerField(
+        'количество'
+    )
+    price = models.DecimalField(
+        'цена',
+        max_digits=8,
+        decimal_places=2
+    )
+
+    class Meta:
+        verbose_name = 'элемент архивного заказа'
+        verbose_name_plural = 'элементы архивных заказов'
+
+    def __str__(self):
+        return f'{self.product.name if self.product else "удалённый товар"} {self.order}'
+
+
+class ArchivedOrderStatusChange(models.Model):
+    order = models.ForeignKey(
+        ArchivedOrder,
+        verbose_name='заказ',
+        related_name='status_changes',
+        on_delete=models.CASCADE
+    )
+    from_status = models.PositiveSmallIntegerField(
+        'предыдущий статус',
+        choices=Order.ORDER_STATUS_CHOICES,
+        null=True,
+        blank=True
+    )
+    status = models.PositiveSmallIntegerField(
+        'статус',
+        choices=Order.ORDER_STATUS_CHOICES
+    )
+    changed_at = models.DateTimeField(
+        'дата и время изменения статуса'
+    )
+    elapsed = models.DurationField(
+        'время в предыдущем статусе',
+        null=True,
+        blank=True
+    )
+
+    objects = OrderStatusChangeQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'смена статуса архивного заказа'
+        verbose_name_plural = 'смены статусов архивных заказов'
+        indexes = [
+            models.Index(fields=['status', 'changed_at'], name='archived_status_change_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.order_id}: {self.get_status_display()}'
+
+
+class DataVersion(models.Model):
+    name = models.CharField(
+        'название',
+        max_length=50,
+        primary_key=True
+    )
+    version = models.BigIntegerField(
+        'версия'
+    )
+
+    class Meta:
+        verbose_name = 'версия данных'
+        verbose_name_plural = 'версии данных'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
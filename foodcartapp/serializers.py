@@ -1,16 +1,40 @@
-import requests
-
-from django.conf import settings
+from django.db import connection
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
-from .models import Order, OrderProduct, Product
-from coordinates.models import Coordinate
+from .catalog import get_product_ids
+from .dispatch import compute_candidates, get_dispatch_version
+from .models import ArchivedOrder, ArchivedOrderProduct, Order, OrderProduct, Product
+from coordinates.cache import coordinate_cache
+from coordinates.tasks import enqueue_geocoding
 
 from phonenumber_field.serializerfields import PhoneNumberField
 
 
+class ProductIdField(serializers.PrimaryKeyRelatedField):
+    """Проверяет только тип id, существование всех товаров заказа проверяет OrderSerializer одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        # Число вне диапазона первичного ключа база не примет даже в запросе, такого товара точно нет
+        min_value, max_value = connection.ops.integer_field_range(self.queryset.model._meta.pk.get_internal_type())
+        if (min_value is not None and pk < min_value) or (max_value is not None and pk > max_value):
+            self.fail('does_not_exist', pk_value=data)
+        return pk
+
+
+class OrderPhoneNumberField(PhoneNumberField):
+    def to_internal_value(self, data):
+        return super().to_internal_value(data).as_e164
+
+
 class OrderProductSerializer(ModelSerializer):
-    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.values_list('id', flat=True))
+    product = ProductIdField(queryset=Product.objects.all())
 
     class Meta:
         model = OrderProduct
@@ -19,62 +43,89 @@ class OrderProductSerializer(ModelSerializer):
 
 class OrderSerializer(ModelSerializer):
     products = OrderProductSerializer(many=True, allow_empty=False, write_only=True)
-    phonenumber = str(PhoneNumberField(region='RU'))
+    phonenumber = OrderPhoneNumberField(region='RU')
 
     class Meta:
         model = Order
         fields = ['firstname', 'lastname', 'phonenumber', 'address', 'products']
 
+    def validate_products(self, products):
+        products_ids = {product['product'] for product in products}
+        missing_ids = products_ids - get_product_ids()
+        if missing_ids:
+            missing_ids -= set(Product.objects.filter(pk__in=missing_ids).values_list('id', flat=True))
+        if missing_ids:
+            raise serializers.ValidationError(self.missing_products_errors(products, missing_ids), code='does_not_exist')
+        return products
+
+    @staticmethod
+    def missing_products_errors(products, missing_ids):
+        does_not_exist = ProductIdField.default_error_messages['does_not_exist']
+        return [
+            {'product': [does_not_exist.format(pk_value=product['product'])]}
+            if product['product'] in missing_ids else {}
+            for product in products
+        ]
+
     def create(self, validated_data):
+        products_ids = {product['product'] for product in validated_data['products']}
+        prices = dict(Product.objects.filter(pk__in=products_ids).values_list('pk', 'price'))
+        if len(prices) < len(products_ids):
+            # Товар могли удалить уже после проверки заказа
+            raise serializers.ValidationError({
+                'products': self.missing_products_errors(validated_data['products'], products_ids - prices.keys())
+            }, code='does_not_exist')
+        total_price = sum(
+            prices[product['product']] * product['quantity']
+            for product in validated_data['products']
+        )
+
+        candidates_version = get_dispatch_version()
+        restaurant_candidates = None
+        coordinate = coordinate_cache.get(validated_data['address'])
+        if coordinate is not None and coordinate.lat is not None and coordinate.lon is not None:
+            restaurant_candidates = compute_candidates(products_ids, coordinate.lat, coordinate.lon)
+
         order = Order.objects.create(
             firstname=validated_data['firstname'],
             lastname=validated_data['lastname'],
             phonenumber=validated_data['phonenumber'],
-            address=validated_data['address']
+            address=validated_data['address'],
+            total_price=total_price,
+            restaurant_candidates=restaurant_candidates,
+            candidates_version=candidates_version if restaurant_candidates else ''
         )
 
-        coordinates = Coordinate.objects.all()
-        order_addresses = [coordinate.address for coordinate in coordinates]
-
-        if validated_data['address'] not in order_addresses:
-            def fetch_coordinates(address):
-                apikey = settings.YANDEX_APIKEY
-                try:
-                    base_url = "https://geocode-maps.yandex.ru/1.x"
-                    response = requests.get(base_url, params={
-                        "geocode": address,
-                        "apikey": apikey,
-                        "format": "json",
-                    })
-                    response.raise_for_status()
-                    found_places = response.json()['response']['GeoObjectCollection']['featureMember']
-
-                    if not found_places:
-                        return None
-
-                    most_relevant = found_places[0]
-                    lon, lat = most_relevant['GeoObject']['Point']['pos'].split(" ")
-                    return lon, lat
-                except requests.exceptions.HTTPError as error:
-                    print(f'HTTPError: {error}')
-                    return None
-
-            lon, lat = fetch_coordinates(validated_data['address'])
-            coordinates.create(
-                address=validated_data['address'],
-                lon=lon,
-                lat=lat
-            )
+        if coordinate is None:
+            enqueue_geocoding(validated_data['address'])
 
-        products_ids = [product['product'] for product in validated_data['products']]
-        products = Product.objects.filter(pk__in=products_ids)
-        product_map = {product.pk: product for product in products}
-        for product in validated_data['products']:
-            product_obj = product_map.get(product['product'])
-            OrderProduct.objects.create(
+        OrderProduct.objects.bulk_create([
+            OrderProduct(
                 order=order,
-                product=product_obj,
+                product_id=product['product'],
                 quantity=product['quantity'],
-                price=product_obj.price
+                price=prices[product['product']]
             )
+            for product in validated_data['products']
+        ])
         return order
+
+
+class ArchivedOrderProductSerializer(ModelSerializer):
+    class Meta:
+        model = ArchivedOrderProduct
+        fields = ['product', 'quantity', 'price']
+
+
+class ArchivedOrderSerializer(ModelSerializer):
+    products = ArchivedOrderProductSerializer(many=True, read_only=True)
+    status = serializers.CharField(source='get_status_display', read_only=True)
+    payment = serializers.CharField(source='get_payment_display', read_only=True)
+
+    class Meta:
+        model = ArchivedOrder
+        fields = [
+            'id', 'firstname', 'lastname', 'phonenumber', 'address', 'status', 'payment', 'comment',
+            'order_date', 'call_date', 'delivery_date', 'restaurant', 'total_price', 'products'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,80 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Order, OrderStatusChange, Product, ProductCategory, Restaurant, RestaurantMenuItem
+from .thumbnails import enqueue_thumbnails
+from .versions import CATALOG_VERSION, MENU_VERSION, RESTAURANT_VERSION, bump_version
+
+
+@receiver(pre_save, sender=RestaurantMenuItem)
+def remember_menu_item_product(sender, instance, **kwargs):
+    instance._previous_product_id = (
+        RestaurantMenuItem.objects
+        .filter(pk=instance.pk)
+        .values_list('product_id', flat=True)
+        .first()
+    ) if instance.pk else None
+
+
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def update_product_availability(sender, instance, **kwargs):
+    product_ids = {instance.product_id, getattr(instance, '_previous_product_id', None)} - {None}
+    Product.objects.filter(pk__in=product_ids).update_availability()
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_image(sender, instance, **kwargs):
+    previous_image = (
+        Product.objects
+        .filter(pk=instance.pk)
+        .values_list('image', flat=True)
+        .first()
+    ) if instance.pk else None
+    instance._image_changed = bool(instance.image) and (
+        not instance.image._committed or instance.image.name != previous_image
+    )
+
+
+@receiver(post_save, sender=Product)
+def make_product_thumbnails(sender, instance, **kwargs):
+    if getattr(instance, '_image_changed', False):
+        enqueue_thumbnails(instance.image.name)
+
+
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def invalidate_menu_index(sender, **kwargs):
+    bump_version(MENU_VERSION)
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def invalidate_restaurant_grid(sender, **kwargs):
+    bump_version(RESTAURANT_VERSION)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductCategory)
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def invalidate_catalog(sender, **kwargs):
+    bump_version(CATALOG_VERSION)
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'status' not in update_fields:
+        instance._previous_status = instance.status
+        return
+    instance._previous_status = (
+        Order.objects
+        .filter(pk=instance.pk)
+        .values_list('status', flat=True)
+        .first()
+    ) if instance.pk else None
+
+
+@receiver(post_save, sender=Order)
+def log_order_status(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_status = getattr(instance, '_previous_status', None)
+    if created or previous_status != instance.status:
+        OrderStatusChange.record(instance, previous_status)
@@ -0,0 +1,135 @@
+from collections import defaultdict
+from math import cos, floor, radians
+
+from django.conf import settings
+from django.core.cache import cache
+
+from coordinates.distance import distance_matrix
+
+from .models import Restaurant
+from .versions import RESTAURANT_VERSION, get_version
+
+
+KM_PER_DEGREE = 111.19
+
+
+class RestaurantGrid:
+    """Сеточный пространственный индекс ресторанов: ячейки cell_size x cell_size градусов."""
+
+    def __init__(self, restaurants, cell_size):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        for restaurant_id, lat, lon in restaurants:
+            self.cells[self._cell(lat, lon)].append((restaurant_id, lat, lon))
+        self.cells = dict(self.cells)
+        rows = [row for row, _ in self.cells]
+        columns = [column for _, column in self.cells]
+        self.bounds = (min(rows), max(rows), min(columns), max(columns)) if self.cells else None
+
+    @classmethod
+    def build(cls, cell_size=None):
+        restaurants = (
+            Restaurant.objects
+            .filter(lat__isnull=False, lon__isnull=False)
+            .values_list('id', 'lat', 'lon')
+        )
+        return cls(restaurants, cell_size or settings.SPATIAL_INDEX_CELL_SIZE)
+
+    def _cell(self, lat, lon):
+        return floor(lat / self.cell_size), floor(lon / self.cell_size)
+
+    def _ring(self, center, ring):
+        row, column = center
+        if ring == 0:
+            yield center
+            return
+        for offset in range(-ring, ring + 1):
+            yield row - ring, column + offset
+            yield row + ring, column + offset
+        for offset in range(-ring + 1, ring):
+            yield row + offset, column - ring
+            yield row + offset, column + ring
+
+    @staticmethod
+    def _ring_number(center, cell):
+        return max(abs(cell[0] - center[0]), abs(cell[1] - center[1]))
+
+    def _max_ring(self, center):
+        if self.bounds is None:
+            return -1
+        min_row, max_row, min_column, max_column = self.bounds
+        return max(
+            abs(center[0] - min_row),
+            abs(center[0] - max_row),
+            abs(center[1] - min_column),
+            abs(center[1] - max_column)
+        )
+
+    @staticmethod
+    def _measure(lat, lon, points, radius_km, restaurant_ids):
+        points = [
+            (restaurant_id, point_lat, point_lon)
+            for restaurant_id, point_lat, point_lon in points
+            if restaurant_ids is None or restaurant_id in restaurant_ids
+        ]
+        if not points:
+            return []
+        distances = distance_matrix([(lat, lon)], [(point_lat, point_lon) for _, point_lat, point_lon in points])[0]
+        return [
+            (restaurant_id, point_distance)
+            for (restaurant_id, _, _), point_distance in zip(points, distances)
+            if radius_km is None or point_distance <= radius_km
+        ]
+
+    def nearest(self, lat, lon, k=None, radius_km=None, restaurant_ids=None):
+        """Ближайшие к точке рестораны: список (id ресторана, расстояние в км) по возрастанию расстояния.
+
+        restaurant_ids ограничивает поиск заданными ресторанами, radius_km отсекает дальние.
+        """
+        if restaurant_ids is not None and not restaurant_ids:
+            return []
+        center = self._cell(lat, lon)
+        max_ring = self._max_ring(center)
+        found = []
+        ring = 0
+        while ring <= max_ring:
+            if ring > len(self.cells):
+                # Колец осталось больше, чем занятых ячеек: дальние ячейки дешевле перебрать целиком
+                found.extend(self._measure(lat, lon, [
+                    point
+                    for cell, points in self.cells.items()
+                    if self._ring_number(center, cell) >= ring
+                    for point in points
+                ], radius_km, restaurant_ids))
+                break
+
+            found.extend(self._measure(lat, lon, [
+                point
+                for cell in self._ring(center, ring)
+                for point in self.cells.get(cell, [])
+            ], radius_km, restaurant_ids))
+
+            # Любая точка за пределами просмотренных колец не ближе этой границы
+            edge_lat = min(89.0, abs(lat) + (ring + 1) * self.cell_size)
+            covered_km = ring * self.cell_size * KM_PER_DEGREE * cos(radians(edge_lat))
+            if radius_km is not None and covered_km > radius_km:
+                break
+            if k is not None and len(found) >= k and sorted(found, key=lambda item: item[1])[k - 1][1] <= covered_km:
+                break
+            ring += 1
+
+        found.sort(key=lambda item: item[1])
+        return found[:k] if k is not None else found
+
+
+def get_restaurant_grid():
+    key = f'restaurant_grid:{get_version(RESTAURANT_VERSION)}'
+    grid = cache.get(key)
+    if grid is None:
+        grid = RestaurantGrid.build()
+        cache.set(key, grid, timeout=None)
+    return grid
+
+
+def nearest_restaurants(lat, lon, k=None, radius_km=None, restaurant_ids=None):
+    return get_restaurant_grid().nearest(lat, lon, k=k, radius_km=radius_km, restaurant_ids=restaurant_ids)
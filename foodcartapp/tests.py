@@ -0,0 +1,353 @@
+import random
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from coordinates.distance import distance_matrix
+from coordinates.models import Coordinate
+
+from .archive import archivable_orders, archive_orders
+from .assignment import assign_restaurants
+from .menu_index import get_capable_restaurants
+from .models import (
+    ArchivedOrder,
+    DataVersion,
+    Order,
+    OrderProduct,
+    OrderSubmission,
+    Product,
+    Restaurant,
+    RestaurantMenuItem,
+)
+from .spatial import RestaurantGrid
+from .thumbnails import enqueue_thumbnails
+from .versions import MENU_VERSION
+from .views import OrderView
+
+
+class AvailableProductsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant = Restaurant.objects.create(name='Star Burger Арбат', lat=55.75, lon=37.59)
+        cls.burger = Product.objects.create(name='Чизбургер', price=100)
+        cls.fries = Product.objects.create(name='Картошка фри', price=50)
+
+    def test_query_plan_reads_only_products(self):
+        plan = Product.objects.available().explain()
+        self.assertNotIn(RestaurantMenuItem._meta.db_table, plan)
+
+    def test_flag_follows_menu(self):
+        item = RestaurantMenuItem.objects.create(restaurant=self.restaurant, product=self.burger)
+        self.assertQuerySetEqual(Product.objects.available(), [self.burger])
+
+        item.product = self.fries
+        item.save()
+        self.assertQuerySetEqual(Product.objects.available(), [self.fries])
+
+        item.availability = False
+        item.save()
+        self.assertQuerySetEqual(Product.objects.available(), [])
+
+
+class MenuIndexInvalidationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant = Restaurant.objects.create(name='Star Burger Арбат', lat=55.75, lon=37.59)
+        cls.burger = Product.objects.create(name='Чизбургер', price=100)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_menu_change_rebuilds_index(self):
+        self.assertEqual(get_capable_restaurants([self.burger.id]), set())
+
+        item = RestaurantMenuItem.objects.create(restaurant=self.restaurant, product=self.burger)
+        self.assertEqual(get_capable_restaurants([self.burger.id]), {self.restaurant.id})
+
+        item.delete()
+        self.assertEqual(get_capable_restaurants([self.burger.id]), set())
+
+    def test_version_bumped_by_another_process(self):
+        self.assertEqual(get_capable_restaurants([self.burger.id]), set())
+
+        # Другой процесс меняет меню: сигналы этого процесса не срабатывают,
+        # видна только новая версия в базе, а в местном кеше остаётся старый индекс
+        RestaurantMenuItem.objects.bulk_create([
+            RestaurantMenuItem(restaurant=self.restaurant, product=self.burger)
+        ])
+        DataVersion.objects.filter(name=MENU_VERSION).update(version=F('version') + 1)
+
+        self.assertEqual(get_capable_restaurants([self.burger.id]), {self.restaurant.id})
+
+
+class ProductCatalogApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        restaurant = Restaurant.objects.create(name='Star Burger Арбат', lat=55.75, lon=37.59)
+        cls.burger = Product.objects.create(name='Чизбургер', price=100, image='burger.jpg')
+        RestaurantMenuItem.objects.create(restaurant=restaurant, product=cls.burger)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_not_modified_for_current_etag(self):
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_product_change_updates_catalog(self):
+        response = self.client.get('/api/products/')
+        etag = response['ETag']
+
+        burger = Product.objects.get(pk=self.burger.pk)
+        burger.price = 120
+        burger.save()
+
+        response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['price'], '120.00')
+
+
+@override_settings(GEOCODER_BACKEND='coordinates.geocoder.FakeGeocoder')
+class OrderProductsValidationTest(TestCase):
+    def post_products(self, products):
+        return self.client.post('/api/order/', {
+            'products': products,
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79001234567',
+            'address': 'Москва, Тверская 1',
+        }, content_type='application/json')
+
+    def test_unknown_product_id(self):
+        response = self.post_products([{'product': 12345, 'quantity': 1}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['products'][0]['product'][0].code, 'does_not_exist')
+
+    def test_oversized_product_id(self):
+        response = self.post_products([{'product': 10 ** 30, 'quantity': 1}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['products'][0]['product'][0].code, 'does_not_exist')
+        self.assertFalse(Order.objects.exists())
+
+
+@override_settings(GEOCODER_BACKEND='coordinates.geocoder.FakeGeocoder')
+class OrderIdempotencyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.burger = Product.objects.create(name='Чизбургер', price=100)
+        cls.order_data = {
+            'products': [{'product': cls.burger.id, 'quantity': 2}],
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79001234567',
+            'address': 'Москва, Тверская 1',
+        }
+
+    def post_order(self, idempotency_key):
+        return self.client.post(
+            '/api/order/',
+            self.order_data,
+            content_type='application/json',
+            HTTP_IDEMPOTENCY_KEY=idempotency_key
+        )
+
+    def test_repeated_key_creates_one_order(self):
+        first_response = self.post_order('checkout-1')
+        second_response = self.post_order('checkout-1')
+
+        self.assertEqual(first_response.status_code, 200)
+        self.assertEqual(second_response.json(), first_response.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_concurrent_submission_with_same_key(self):
+        first_response = self.post_order('checkout-1')
+
+        # Параллельный запрос проверил ключ до того, как первый успел его сохранить
+        with mock.patch.object(OrderView, 'get_submission', side_effect=[None, OrderSubmission.objects.get()]):
+            second_response = self.post_order('checkout-1')
+
+        self.assertEqual(second_response.status_code, 200)
+        self.assertEqual(second_response.json(), first_response.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_expired_key_creates_new_order(self):
+        self.post_order('checkout-1')
+        with override_settings(ORDER_IDEMPOTENCY_TTL=-1):
+            self.post_order('checkout-1')
+
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(OrderSubmission.objects.count(), 1)
+
+    def test_too_long_key(self):
+        response = self.post_order('x' * 65)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+
+class RestaurantGridTest(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.rng = rng
+        self.restaurants = [
+            (restaurant_id, rng.uniform(55.5, 56.0), rng.uniform(37.3, 37.9))
+            for restaurant_id in range(150)
+        ]
+        # Одиночные дальние рестораны: из-за них колец много, а занятых ячеек мало
+        self.restaurants += [(150, 43.1, 131.9), (151, 59.93, 30.31), (152, -33.9, 18.4)]
+        self.grid = RestaurantGrid(self.restaurants, 0.05)
+
+    def brute_force(self, lat, lon, k, radius_km, restaurant_ids):
+        restaurants = [
+            restaurant for restaurant in self.restaurants
+            if restaurant_ids is None or restaurant[0] in restaurant_ids
+        ]
+        if not restaurants:
+            return []
+        distances = distance_matrix([(lat, lon)], [(point_lat, point_lon) for _, point_lat, point_lon in restaurants])[0]
+        found = sorted(
+            (
+                (restaurant_id, distance)
+                for (restaurant_id, _, _), distance in zip(restaurants, distances)
+                if radius_km is None or distance <= radius_km
+            ),
+            key=lambda item: item[1]
+        )
+        return found[:k] if k is not None else found
+
+    def test_matches_brute_force(self):
+        points = [(43.1, 131.9), (59.93, 30.31), (-33.9, 18.4), (0.0, 0.0), (70.0, -150.0)]
+        points += [(self.rng.uniform(55.3, 56.2), self.rng.uniform(37.0, 38.2)) for _ in range(20)]
+        restaurant_id_choices = [None, set(), {150}, set(self.rng.sample(range(153), 10))]
+        for lat, lon in points:
+            for k in (None, 1, 5):
+                for radius_km in (None, 3, 10000):
+                    for restaurant_ids in restaurant_id_choices:
+                        with self.subTest(lat=lat, lon=lon, k=k, radius_km=radius_km, restaurant_ids=restaurant_ids):
+                            found = self.grid.nearest(lat, lon, k=k, radius_km=radius_km, restaurant_ids=restaurant_ids)
+                            expected = self.brute_force(lat, lon, k, radius_km, restaurant_ids)
+                            self.assertEqual([restaurant_id for restaurant_id, _ in found], [restaurant_id for restaurant_id, _ in expected])
+
+    def test_empty_grid(self):
+        self.assertEqual(RestaurantGrid([], 0.05).nearest(55.75, 37.61), [])
+
+
+@override_settings(PRODUCT_THUMBNAILS_ASYNC=False)
+class ThumbnailsTest(TestCase):
+    def test_missing_image_is_logged(self):
+        with self.assertLogs('foodcartapp.thumbnails', level='ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                enqueue_thumbnails('missing/burger.jpg')
+
+
+class AssignmentTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        burger = Product.objects.create(name='Чизбургер', price=100)
+        cls.near = Restaurant.objects.create(name='Star Burger Тверская', lat=55.75, lon=37.6)
+        cls.far = Restaurant.objects.create(name='Star Burger Сокол', lat=55.8, lon=37.6)
+        for restaurant in (cls.near, cls.far):
+            RestaurantMenuItem.objects.create(restaurant=restaurant, product=burger)
+
+        # Все заказы ближе к первому ресторану, но третий — ближе остальных ко второму
+        cls.orders = []
+        for number, lat in enumerate([55.751, 55.752, 55.753], start=1):
+            address = f'Москва, Тверская {number}'
+            Coordinate.objects.create(address=address, lat=lat, lon=37.6)
+            order = Order.objects.create(
+                firstname='Иван',
+                lastname='Петров',
+                phonenumber='+79001234567',
+                address=address
+            )
+            OrderProduct.objects.create(order=order, product=burger, quantity=1, price=100)
+            cls.orders.append(order)
+
+    def setUp(self):
+        cache.clear()
+
+    def assigned_restaurants(self):
+        return list(
+            Order.objects.filter(pk__in=[order.pk for order in self.orders])
+            .order_by('pk')
+            .values_list('restaurant_id', flat=True)
+        )
+
+    def test_zero_capacity(self):
+        self.assertEqual(assign_restaurants(capacity=0), [])
+        self.assertEqual(self.assigned_restaurants(), [None, None, None])
+
+    def test_nearest_pairs_first(self):
+        assign_restaurants(capacity=1)
+        self.assertEqual(self.assigned_restaurants(), [self.near.id, None, self.far.id])
+
+    def test_capacity_limit(self):
+        assign_restaurants(capacity=2)
+        self.assertEqual(self.assigned_restaurants(), [self.near.id, self.near.id, self.far.id])
+
+    def test_active_orders_take_capacity(self):
+        Order.objects.create(
+            firstname='Пётр',
+            lastname='Иванов',
+            phonenumber='+79001234568',
+            address='Москва, Арбат 1',
+            status=Order.Cooking,
+            restaurant=self.near
+        )
+        assign_restaurants(capacity=2)
+        self.assertEqual(self.assigned_restaurants(), [self.near.id, self.far.id, self.far.id])
+
+    def test_dry_run_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            assigned_orders = assign_restaurants(capacity=2, dry_run=True)
+
+        self.assertEqual(len(assigned_orders), 3)
+        writes = [query['sql'] for query in queries if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(writes, [])
+        self.assertEqual(self.assigned_restaurants(), [None, None, None])
+        self.assertFalse(Order.objects.filter(restaurant_candidates__isnull=False).exists())
+
+
+class ArchiveOrdersTest(TestCase):
+    def complete_order(self, days_ago):
+        order = Order.objects.create(
+            firstname='Иван',
+            lastname='Петров',
+            phonenumber='+79001234567',
+            address='Москва, Тверская 1'
+        )
+        order.status = Order.Completed
+        order.save()
+        order.status_changes.filter(status=Order.Completed).update(
+            changed_at=timezone.now() - timedelta(days=days_ago)
+        )
+        return order
+
+    def test_archives_by_last_completion(self):
+        old_order = self.complete_order(days_ago=400)
+        recent_order = self.complete_order(days_ago=1)
+        # Давно завершённый заказ вернули в работу и завершили сегодня
+        reopened_order = self.complete_order(days_ago=400)
+        for status in (Order.Cooking, Order.Completed):
+            reopened_order.status = status
+            reopened_order.save()
+
+        before = timezone.now() - timedelta(days=90)
+        self.assertQuerySetEqual(archivable_orders(before), [old_order])
+
+        self.assertEqual(sum(archive_orders(before, batch_size=1)), 1)
+        self.assertQuerySetEqual(ArchivedOrder.objects.values_list('id', flat=True), [old_order.id])
+        self.assertQuerySetEqual(Order.objects.order_by('id'), [recent_order, reopened_order])
@@ -0,0 +1,108 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+from .versions import CATALOG_VERSION, bump_version
+
+
+THUMBNAIL_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+JPEG_BACKGROUND = (255, 255, 255)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def thumbnail_name(image_name, size, extension):
+    stem = os.path.splitext(image_name)[0]
+    return f'thumbnails/{size}/{stem}.{extension}'
+
+
+def generate_thumbnails(image_name):
+    """Сохраняет уменьшенные копии картинки во всех размерах и форматах из PRODUCT_THUMBNAIL_SIZES."""
+    with default_storage.open(image_name) as image_file:
+        image = ImageOps.exif_transpose(Image.open(image_file))
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    for size, dimensions in settings.PRODUCT_THUMBNAIL_SIZES.items():
+        thumbnail = image.copy()
+        thumbnail.thumbnail(dimensions)
+        for extension, image_format in THUMBNAIL_FORMATS.items():
+            rendition = thumbnail
+            if image_format == 'JPEG' and thumbnail.mode == 'RGBA':
+                # В JPEG нет прозрачности: кладём картинку на белый фон, иначе прозрачное станет чёрным
+                rendition = Image.new('RGB', thumbnail.size, JPEG_BACKGROUND)
+                rendition.paste(thumbnail, mask=thumbnail.getchannel('A'))
+            content = BytesIO()
+            rendition.save(content, image_format, quality=settings.PRODUCT_THUMBNAIL_QUALITY)
+            name = thumbnail_name(image_name, size, extension)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            default_storage.save(name, ContentFile(content.getvalue()))
+    bump_version(CATALOG_VERSION)
+
+
+def thumbnail_urls(image_name):
+    urls = {}
+    for size in settings.PRODUCT_THUMBNAIL_SIZES:
+        renditions = {
+            extension: default_storage.url(thumbnail_name(image_name, size, extension))
+            for extension in THUMBNAIL_FORMATS
+            if default_storage.exists(thumbnail_name(image_name, size, extension))
+        }
+        if renditions:
+            urls[size] = renditions
+    return urls
+
+
+def thumbnail_url(image_name, size, extension='jpeg'):
+    name = thumbnail_name(image_name, size, extension)
+    return default_storage.url(name) if default_storage.exists(name) else None
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='thumbnails')
+        return _executor
+
+
+def _generate_or_log(image_name):
+    try:
+        generate_thumbnails(image_name)
+    except Exception:
+        logger.exception('Не удалось подготовить превью для %r', image_name)
+
+
+def _run_in_background(image_name):
+    try:
+        _generate_or_log(image_name)
+    finally:
+        connection.close()
+
+
+def enqueue_thumbnails(image_name):
+    """Готовит превью после коммита текущей транзакции, не задерживая сохранение товара.
+
+    Ошибка при подготовке превью только пишется в лог: товар к этому моменту уже сохранён.
+    """
+    def submit():
+        if settings.PRODUCT_THUMBNAILS_ASYNC:
+            _get_executor().submit(_run_in_background, image_name)
+        else:
+            _generate_or_log(image_name)
+    transaction.on_commit(submit)
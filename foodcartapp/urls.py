@@ -1,6 +1,6 @@
 from django.urls import path
 
-from .views import product_list_api, banners_list_api, OrderView
+from .views import product_list_api, banners_list_api, ArchivedOrderView, OrderView
 
 
 app_name = "foodcartapp"
@@ -9,4 +9,5 @@ urlpatterns = [
     path('products/', product_list_api),
     path('banners/', banners_list_api),
     path('order/', OrderView.as_view()),
+    path('archive/orders/', ArchivedOrderView.as_view()),
 ]
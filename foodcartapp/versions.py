@@ -0,0 +1,33 @@
+import time
+
+from django.db.models import F
+
+from .models import DataVersion
+
+
+MENU_VERSION = 'menu'
+RESTAURANT_VERSION = 'restaurant'
+CATALOG_VERSION = 'catalog'
+
+# Счётчики хранятся в базе, а не в кеше: кеш по умолчанию у каждого процесса свой,
+# и смена версии в одном процессе не дошла бы до остальных
+
+
+def _initial_version():
+    # Начинаем со времени, чтобы после пересоздания базы
+    # не совпасть со старыми данными в общем кеше
+    return int(time.time() * 1000)
+
+
+def get_version(name):
+    version, _ = DataVersion.objects.get_or_create(
+        name=name,
+        defaults={'version': _initial_version()}
+    )
+    return version.version
+
+
+def bump_version(name):
+    if not DataVersion.objects.filter(name=name).update(version=F('version') + 1):
+        DataVersion.objects.get_or_create(name=name, defaults={'version': _initial_version()})
+    return get_version(name)
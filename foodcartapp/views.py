@@ -1,11 +1,21 @@
-from django.db import transaction
-from django.http import JsonResponse
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.templatetags.static import static
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
-from .models import Order, Product
-from .serializers import OrderSerializer
+from .catalog import get_catalog
+from .models import ArchivedOrder, Order, OrderSubmission
+from .serializers import ArchivedOrderSerializer, OrderSerializer
 
 
 def banners_list_api(request):
@@ -33,45 +43,117 @@ def banners_list_api(request):
 
 
 def product_list_api(request):
-    products = Product.objects.select_related('category').available()
-
-    dumped_products = []
-    for product in products:
-        dumped_product = {
-            'id': product.id,
-            'name': product.name,
-            'price': product.price,
-            'special_status': product.special_status,
-            'description': product.description,
-            'category': {
-                'id': product.category.id,
-                'name': product.category.name,
-            } if product.category else None,
-            'image': product.image.url,
-            'restaurant': {
-                'id': product.id,
-                'name': product.name,
-            }
-        }
-        dumped_products.append(dumped_product)
-    return JsonResponse(dumped_products, safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    etag, content = get_catalog()
+    quoted_etag = quote_etag(etag)
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (if_none_match.strip() == '*' or quoted_etag in parse_etags(if_none_match)):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = quoted_etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+class OrderCursorPagination(CursorPagination):
+    ordering = 'id'
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ArchivedOrderCursorPagination(OrderCursorPagination):
+    page_size = settings.ORDERS_PAGE_SIZE
+
+
+def stream_orders(orders, ndjson=False):
+    encoder = JSONEncoder(ensure_ascii=False)
+    if not ndjson:
+        yield '['
+    for number, order in enumerate(orders.iterator(chunk_size=settings.ORDERS_STREAM_CHUNK_SIZE)):
+        dumped_order = encoder.encode(OrderSerializer(order).data)
+        if ndjson:
+            yield f'{dumped_order}\n'
+        else:
+            yield f',{dumped_order}' if number else dumped_order
+    if not ndjson:
+        yield ']'
 
 
 class OrderView(APIView):
     def get(self, request):
+        stream = request.query_params.get('stream')
+        if stream in ('json', 'ndjson'):
+            return StreamingHttpResponse(
+                stream_orders(Order.objects.order_by('id'), ndjson=stream == 'ndjson'),
+                content_type='application/x-ndjson' if stream == 'ndjson' else 'application/json'
+            )
+
+        paginator = OrderCursorPagination()
+        orders = paginator.paginate_queryset(Order.objects.all(), request, view=self)
+        if orders is not None:
+            serializer = OrderSerializer(orders, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         with transaction.atomic():
             serializer = OrderSerializer(Order.objects.all(), many=True)
             return Response(serializer.data)
 
     def post(self, request):
-        with transaction.atomic():
-            serializer = OrderSerializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
-            serializer.create(serializer.validated_data)
-            print(serializer.validated_data)
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key:
+            if len(idempotency_key) > OrderSubmission._meta.get_field('idempotency_key').max_length:
+                return Response({'Idempotency-Key': ['Слишком длинный ключ.']}, status=status.HTTP_400_BAD_REQUEST)
+            submission = self.get_submission(idempotency_key)
+            if submission:
+                return Response(submission.response)
+
+        try:
+            with transaction.atomic():
+                serializer = OrderSerializer(data=request.data)
+                serializer.is_valid(raise_exception=True)
+                order = serializer.create(serializer.validated_data)
+
+                content = {'New order added': serializer.validated_data}
+                if idempotency_key:
+                    # Удаляем только просроченный ключ: свежий мог сохранить параллельный запрос,
+                    # и тогда create упадёт на уникальности вместо второго заказа
+                    OrderSubmission.objects.filter(
+                        idempotency_key=idempotency_key,
+                        created_at__lt=timezone.now() - timedelta(seconds=settings.ORDER_IDEMPOTENCY_TTL)
+                    ).delete()
+                    OrderSubmission.objects.create(
+                        idempotency_key=idempotency_key,
+                        order=order,
+                        response=content
+                    )
+                return Response(content)
+        except IntegrityError:
+            # Повтор с тем же ключом успел создать заказ параллельно
+            submission = self.get_submission(idempotency_key) if idempotency_key else None
+            if submission is None:
+                raise
+            return Response(submission.response)
+
+    @staticmethod
+    def get_submission(idempotency_key):
+        expires_at = timezone.now() - timedelta(seconds=settings.ORDER_IDEMPOTENCY_TTL)
+        return OrderSubmission.objects.filter(
+            idempotency_key=idempotency_key,
+            created_at__gte=expires_at
+        ).first()
+
+
+class ArchivedOrderView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        orders = ArchivedOrder.objects.prefetch_related('products')
+        phonenumber = request.query_params.get('phonenumber')
+        if phonenumber:
+            orders = orders.filter(phonenumber=phonenumber)
 
-            content = {'New order added': serializer.validated_data}
-            return Response(content)
+        paginator = ArchivedOrderCursorPagination()
+        orders = paginator.paginate_queryset(orders, request, view=self)
+        serializer = ArchivedOrderSerializer(orders, many=True)
+        return paginator.get_paginated_response(serializer.data)
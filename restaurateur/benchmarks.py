@@ -0,0 +1,123 @@
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from coordinates.cache import normalize_address
+from coordinates.geocoder import FakeGeocoder
+from coordinates.models import Coordinate
+from foodcartapp.models import (
+    Order, OrderProduct, Product, ProductCategory, Restaurant, RestaurantMenuItem
+)
+from foodcartapp.versions import CATALOG_VERSION, MENU_VERSION, RESTAURANT_VERSION, bump_version
+
+
+def generate_data(restaurants_count, products_count, orders_count, cart_size, seed=0):
+    """Заполняет базу синтетическими ресторанами, меню и заказами по Москве."""
+    rng = random.Random(seed)
+    geocoder = FakeGeocoder()
+
+    categories = ProductCategory.objects.bulk_create([
+        ProductCategory(name=name) for name in ('Бургеры', 'Напитки', 'Десерты', 'Закуски')
+    ])
+    restaurants = []
+    for number in range(restaurants_count):
+        address = f'Москва, ресторанная улица, {number + 1}'
+        lon, lat = geocoder.geocode(address)
+        restaurants.append(Restaurant(name=f'Ресторан {number + 1}', address=address, lat=lat, lon=lon))
+    restaurants = Restaurant.objects.bulk_create(restaurants)
+
+    products = Product.objects.bulk_create([
+        Product(
+            name=f'Товар {number + 1}',
+            category=rng.choice(categories),
+            price=rng.randint(50, 900),
+            image='benchmark.jpg',
+        )
+        for number in range(products_count)
+    ])
+    RestaurantMenuItem.objects.bulk_create([
+        RestaurantMenuItem(restaurant=restaurant, product=product, availability=rng.random() < 0.9)
+        for restaurant in restaurants
+        for product in products
+        if rng.random() < 0.7
+    ], batch_size=1000)
+    Product.objects.update_availability()
+
+    addresses = [f'Москва, улица клиентов, {number + 1}' for number in range(max(1, orders_count // 3))]
+    coordinates = []
+    for address in addresses:
+        lon, lat = geocoder.geocode(address)
+        coordinates.append(Coordinate(address=address, normalized_address=normalize_address(address), lat=lat, lon=lon))
+    Coordinate.objects.bulk_create(coordinates)
+
+    statuses = [status for status, _ in Order.ORDER_STATUS_CHOICES]
+    orders = Order.objects.bulk_create([
+        Order(
+            firstname='Иван',
+            lastname='Петров',
+            phonenumber='+79001234567',
+            address=rng.choice(addresses),
+            status=rng.choice(statuses),
+        )
+        for _ in range(orders_count)
+    ], batch_size=1000)
+    order_products = []
+    for order in orders:
+        cart = rng.sample(products, min(len(products), rng.randint(1, cart_size * 2 - 1)))
+        total_price = 0
+        for product in cart:
+            quantity = rng.randint(1, 3)
+            order_products.append(OrderProduct(order=order, product=product, quantity=quantity, price=product.price))
+            total_price += product.price * quantity
+        order.total_price = total_price
+    OrderProduct.objects.bulk_create(order_products, batch_size=1000)
+    Order.objects.bulk_update(orders, ['total_price'], batch_size=1000)
+
+    for version in (CATALOG_VERSION, MENU_VERSION, RESTAURANT_VERSION):
+        bump_version(version)
+    return {
+        'restaurants': restaurants,
+        'products': products,
+        'orders': orders,
+        'addresses': addresses,
+    }
+
+
+def measure(action, repeat):
+    """Запускает action repeat раз и возвращает задержку, число запросов к БД и пиковую память.
+
+    Память меряется отдельным прогоном: tracemalloc сильно замедляет код и исказил бы задержку.
+    """
+    latencies = []
+    queries = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started_at = time.perf_counter()
+            action()
+            latencies.append((time.perf_counter() - started_at) * 1000)
+        queries.append(len(captured))
+
+    tracemalloc.start()
+    action()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'repeat': repeat,
+        'latency_ms': {
+            'mean': statistics.fmean(latencies),
+            'p50': latencies[len(latencies) // 2],
+            'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'max': latencies[-1],
+        },
+        'queries': {
+            'mean': statistics.fmean(queries),
+            'max': max(queries),
+        },
+        'peak_memory_kb': round(peak_memory / 1024, 1),
+    }
@@ -0,0 +1,107 @@
+import json
+import platform
+import random
+
+import django
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from foodcartapp.models import Order
+from restaurateur.benchmarks import generate_data, measure
+
+
+class Command(BaseCommand):
+    help = 'Замеряет приём заказов, каталог и страницы менеджера на синтетических данных во временной БД'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=20)
+        parser.add_argument('--products', type=int, default=100)
+        parser.add_argument('--orders', type=int, default=500)
+        parser.add_argument('--cart-size', type=int, default=4, help='средний размер корзины')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='файл для JSON с результатами, по умолчанию stdout')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_database_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(
+                GEOCODER_BACKEND='coordinates.geocoder.FakeGeocoder',
+                GEOCODER_OPTIONS={},
+                GEOCODER_ASYNC=False,
+            ):
+                results = self.run_benchmarks(options)
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+            teardown_test_environment()
+
+        report = json.dumps(results, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
+
+    def run_benchmarks(self, options):
+        cache.clear()
+        rng = random.Random(options['seed'])
+        data = generate_data(
+            options['restaurants'],
+            options['products'],
+            options['orders'],
+            options['cart_size'],
+            seed=options['seed']
+        )
+        manager = User.objects.create_user('benchmark', password='benchmark', is_staff=True, is_superuser=True)
+        client = Client()
+        client.force_login(manager)
+        repeat = options['repeat']
+
+        def post_order():
+            cart = rng.sample(data['products'], min(len(data['products']), options['cart_size']))
+            client.post('/api/order/', {
+                'firstname': 'Иван',
+                'lastname': 'Петров',
+                'phonenumber': '+79001234567',
+                'address': rng.choice(data['addresses']),
+                'products': [{'product': product.id, 'quantity': 1} for product in cart],
+            }, content_type='application/json')
+
+        def product_list_cold():
+            cache.clear()
+            client.get('/api/products/')
+
+        order_admin = admin.site._registry[Order]
+        admin_request = RequestFactory().get('/admin/')
+        admin_request.user = manager
+        sample_order = data['orders'][0]
+
+        benchmarks = {
+            'order_post': lambda: measure(post_order, repeat),
+            'product_list_api_cold': lambda: measure(product_list_cold, repeat),
+            'product_list_api': lambda: measure(lambda: client.get('/api/products/'), repeat),
+            'view_orders': lambda: measure(lambda: client.get('/manager/orders/'), repeat),
+            'view_products': lambda: measure(lambda: client.get('/manager/products/'), repeat),
+            'order_admin_get_form': lambda: measure(lambda: order_admin.get_form(admin_request, sample_order), repeat),
+        }
+        return {
+            'created_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'parameters': {
+                key: options[key]
+                for key in ('restaurants', 'products', 'orders', 'cart_size', 'repeat', 'seed')
+            },
+            'results': {name: benchmark() for name, benchmark in benchmarks.items()},
+        }
@@ -0,0 +1,66 @@
+import threading
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+external_seconds = ContextVar('external_seconds', default=None)
+
+
+def add_external_time(seconds):
+    """Учитывает время внешнего вызова (например, геокодера) в метриках текущего запроса."""
+    spent = external_seconds.get()
+    if spent is not None:
+        spent.append(seconds)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class RequestMetrics:
+    """Кольцевой буфер последних запросов с агрегацией по представлениям."""
+
+    def __init__(self, size):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, view, status, total_ms, db_ms, queries, external_ms):
+        with self._lock:
+            self._samples.append((view, status, total_ms, db_ms, queries, external_ms))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            samples = list(self._samples)
+
+        by_view = defaultdict(list)
+        for sample in samples:
+            by_view[sample[0]].append(sample)
+
+        summary = {}
+        for view, view_samples in by_view.items():
+            view_summary = {
+                'count': len(view_samples),
+                'errors': sum(1 for sample in view_samples if sample[1] >= 500),
+            }
+            for column, name in ((2, 'total_ms'), (3, 'db_ms'), (4, 'queries'), (5, 'external_ms')):
+                values = sorted(sample[column] for sample in view_samples)
+                view_summary[name] = {
+                    'mean': sum(values) / len(values),
+                    'p50': percentile(values, 0.5),
+                    'p95': percentile(values, 0.95),
+                    'p99': percentile(values, 0.99),
+                    'max': values[-1],
+                }
+            summary[view] = view_summary
+        return summary
+
+
+request_metrics = RequestMetrics(settings.REQUEST_METRICS_BUFFER_SIZE)
@@ -0,0 +1,62 @@
+import logging
+import time
+
+from django.db import connection
+
+from .metrics import external_seconds, request_metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """Собирает по каждому запросу общее время, время и число SQL-запросов и время внешних вызовов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_time = [0.0, 0]
+
+        def measure_query(execute, sql, params, many, context):
+            started_at = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db_time[0] += time.perf_counter() - started_at
+                db_time[1] += 1
+
+        external = []
+        token = external_seconds.set(external)
+        started_at = time.perf_counter()
+        try:
+            with connection.execute_wrapper(measure_query):
+                response = self.get_response(request)
+        finally:
+            external_seconds.reset(token)
+
+        def record():
+            total_ms = (time.perf_counter() - started_at) * 1000
+            match = request.resolver_match
+            view = match.view_name if match else 'unresolved'
+            db_ms = db_time[0] * 1000
+            external_ms = sum(external) * 1000
+            request_metrics.record(view, response.status_code, total_ms, db_ms, db_time[1], external_ms)
+            logger.info(
+                '%s %s %s: %.1f ms, %d queries in %.1f ms, external %.1f ms',
+                request.method, view, response.status_code, total_ms, db_time[1], db_ms, external_ms
+            )
+
+        if response.streaming and not response.is_async:
+            # Потоковый ответ выполняет запросы к базе уже после выхода из представления
+            def measure_stream(content):
+                try:
+                    with connection.execute_wrapper(measure_query):
+                        yield from content
+                finally:
+                    record()
+
+            response.streaming_content = measure_stream(response.streaming_content)
+        else:
+            record()
+        return response
@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+
+from coordinates.geocoder import geocoder_called
+
+from .metrics import add_external_time
+
+
+@receiver(geocoder_called)
+def count_geocoder_time(sender, seconds, **kwargs):
+    add_external_time(seconds)
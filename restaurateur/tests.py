@@ -1,3 +1,61 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from foodcartapp.models import Order
+
+
+@override_settings(GEOCODER_BACKEND='coordinates.geocoder.FakeGeocoder', ORDERS_PAGE_SIZE=2)
+class OrdersPageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user('manager', password='secret', is_staff=True)
+        order_date = timezone.now()
+        statuses = [
+            Order.Cooking, Order.Raw, Order.Completed, Order.Raw,
+            Order.Transport, Order.Raw, Order.Cooking, Order.Completed,
+        ]
+        for number, status in enumerate(statuses):
+            order = Order.objects.create(
+                firstname='Клиент',
+                lastname=str(number),
+                phonenumber='+79001234567',
+                address=f'Москва, Тверская {number}',
+                status=status
+            )
+            # Пары заказов с одинаковым временем проверяют сравнение по id внутри курсора
+            Order.objects.filter(pk=order.pk).update(order_date=order_date + timedelta(minutes=number // 2))
+
+    def setUp(self):
+        caches['fragments'].clear()
+        self.client.force_login(self.manager)
+
+    def test_pages_cover_unprocessed_orders_once(self):
+        expected_ids = list(
+            Order.objects
+            .exclude(status=Order.Completed)
+            .order_by('status', 'order_date', 'id')
+            .values_list('id', flat=True)
+        )
+
+        seen_ids = []
+        params = {}
+        for _ in range(len(expected_ids)):
+            response = self.client.get('/manager/orders/', params)
+            self.assertEqual(response.status_code, 200)
+            page = response.context['order_items']
+            self.assertLessEqual(len(page), 2)
+            seen_ids.extend(order.id for order in page)
+            next_cursor = response.context['next_cursor']
+            if next_cursor is None:
+                break
+            params = {'after': next_cursor}
+
+        self.assertEqual(seen_ids, expected_ids)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/manager/orders/', {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
@@ -1,6 +1,9 @@
-from geopy import distance
+from datetime import datetime, timedelta
+from itertools import chain
 
 from django import forms
+from django.conf import settings
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import redirect, render
 from django.views import View
 from django.urls import reverse_lazy
@@ -9,11 +12,15 @@ from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
 
-from collections import defaultdict
-from operator import itemgetter
+from foodcartapp.availability import get_availability_matrix
+from foodcartapp.dispatch import get_order_coordinates, refresh_candidates
+from foodcartapp.models import ArchivedOrderStatusChange, Product, Restaurant, Order, OrderStatusChange
+from foodcartapp.versions import CATALOG_VERSION, MENU_VERSION, RESTAURANT_VERSION, get_version
+from coordinates.cache import normalize_address
+from coordinates.geocoder import get_geocoder
+from coordinates.tasks import enqueue_geocoding
 
-from foodcartapp.models import Product, Restaurant, Order, RestaurantMenuItem
-from coordinates.models import Coordinate
+from .metrics import request_metrics
 
 
 class Login(forms.Form):
@@ -70,21 +77,17 @@ def is_manager(user):
 
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_products(request):
-    restaurants = list(Restaurant.objects.order_by('name'))
-    products = list(Product.objects.prefetch_related('menu_items'))
+    matrix = get_availability_matrix()
+    products = Product.objects.select_related('category')
 
-    products_with_restaurant_availability = []
-    for product in products:
-        availability = {item.restaurant_id: item.availability for item in product.menu_items.all()}
-        ordered_availability = [availability.get(restaurant.id, False) for restaurant in restaurants]
-
-        products_with_restaurant_availability.append(
-            (product, ordered_availability)
-        )
+    products_with_restaurant_availability = [
+        (product, matrix.row(product.id)) for product in products
+    ]
 
     return render(request, template_name="products_list.html", context={
         'products_with_restaurant_availability': products_with_restaurant_availability,
-        'restaurants': restaurants,
+        'restaurants': matrix.restaurants,
+        'fragment_version': f'{get_version(CATALOG_VERSION)}.{get_version(MENU_VERSION)}.{get_version(RESTAURANT_VERSION)}',
     })
 
 
@@ -92,47 +95,83 @@ def view_products(request):
 def view_restaurants(request):
     return render(request, template_name="restaurants_list.html", context={
         'restaurants': Restaurant.objects.all(),
+        'fragment_version': get_version(RESTAURANT_VERSION),
     })
 
 
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_orders(request):
-    orders = Order.objects.prefetch_related('products').select_related('restaurant').order_price()
-    items = RestaurantMenuItem.objects.select_related('restaurant', 'product').filter(availability=True)
-    coordinates = Coordinate.objects.all()
-
-    addresses_with_coords = {coordinate.address: [coordinate.lat, coordinate.lon] for coordinate in coordinates}
-    order_menus = {order.id: [product.id for product in order.products.all()] for order in orders}
-    restaurant_coordinates = {item.restaurant.name: (item.restaurant.lat, item.restaurant.lon) for item in items if item.restaurant.lat and item.restaurant.lon}
-    restaurant_menus = defaultdict(set)
-    for item in items:
-        restaurant_menus[item.restaurant.name].add(item.product.id)
-
-    avalible_restaurants = defaultdict(list)
-    for order_key, order_value in order_menus.items():
-        for restaurant_key, restaurant_value in restaurant_menus.items():
-            if (all([item in restaurant_value for item in order_value])
-                and restaurant_key in restaurant_coordinates):
-                avalible_restaurants[order_key].append(restaurant_key)
-
-    avalible_restaurants_with_distance = defaultdict(list)
+    orders = Order.objects.unprocessed()
+    cursor = request.GET.get('after')
+    if cursor:
+        try:
+            status, order_date, order_id = cursor.split('|')
+            orders = orders.after(int(status), datetime.fromisoformat(order_date), int(order_id))
+        except ValueError:
+            return HttpResponseBadRequest('Некорректный курсор страницы')
+
+    page_size = settings.ORDERS_PAGE_SIZE
+    orders = list(orders.select_related('restaurant')[:page_size + 1])
+    next_cursor = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        last_order = orders[-1]
+        next_cursor = f'{last_order.status}|{last_order.order_date.isoformat()}|{last_order.id}'
+
+    order_coordinates = get_order_coordinates(orders)
+    refresh_candidates(orders, order_coordinates)
+    restaurant_names = dict(Restaurant.objects.values_list('id', 'name'))
+    restaurant_version = get_version(RESTAURANT_VERSION)
+
     for order in orders:
-        if order.address in addresses_with_coords:
-            coordinate = addresses_with_coords[order.address]
-            for restrant_name in avalible_restaurants[order.id]:
-                order_coords = (coordinate[0], coordinate[1])
-                restaurant_distance = distance.distance(
-                    order_coords,
-                    restaurant_coordinates[restrant_name]
-                ).km
-                avalible_restaurants_with_distance[order.id].append(
-                    (restrant_name, round(restaurant_distance, 2))
-                )
-            avalible_restaurants_with_distance[order.id] =(
-                sorted(avalible_restaurants_with_distance[order.id], key=itemgetter(1))
-            )
-            order.restaurant_names_list = avalible_restaurants_with_distance[order.id]
+        coords = order_coordinates.get(normalize_address(order.address))
+        if coords is None:
+            # Адрес мог не геокодироваться из-за ошибки или перезапуска сервера — ставим его в очередь снова
+            enqueue_geocoding(order.address)
+            order.coordinates_pending = True
+        elif None not in coords:
+            order.restaurant_names_list = [
+                (restaurant_names[restaurant_id], restaurant_distance)
+                for restaurant_id, restaurant_distance in order.restaurant_candidates['restaurants']
+            ]
+        # Координаты клиента входят в ключ: refresh_candidates пересчитывает расстояния, не трогая updated_at
+        order.fragment_version = (
+            f'{order.updated_at.timestamp()}.{order.candidates_version}.{restaurant_version}.{coords}'
+        )
 
     return render(request, template_name='order_items.html', context = {
-        'order_items': orders
+        'order_items': orders,
+        'next_cursor': next_cursor,
+    })
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_metrics(request):
+    status_labels = dict(OrderStatusChange.STATUS_CHOICES)
+    stages = {}
+    for stage in chain(
+        OrderStatusChange.objects.stage_latencies(),
+        ArchivedOrderStatusChange.objects.stage_latencies()
+    ):
+        key = (stage['from_status'], stage['status'])
+        orders_count, total_elapsed = stages.get(key, (0, timedelta()))
+        stages[key] = (
+            orders_count + stage['orders_count'],
+            total_elapsed + stage['avg_elapsed'] * stage['orders_count']
+        )
+    return JsonResponse({
+        'requests': request_metrics.summary(),
+        'geocoder': get_geocoder().stats.snapshot(),
+        'order_stages': [
+            {
+                'from': status_labels[from_status],
+                'to': status_labels[status],
+                'orders_count': orders_count,
+                'avg_seconds': round(total_elapsed.total_seconds() / orders_count, 1),
+            }
+            for (from_status, status), (orders_count, total_elapsed) in sorted(stages.items())
+        ],
+    }, json_dumps_params={
+        'ensure_ascii': False,
+        'indent': 4,
     })
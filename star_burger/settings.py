@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'restaurateur.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,12 +84,24 @@ WSGI_APPLICATION = 'star_burger.wsgi.application'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+PRODUCT_THUMBNAIL_SIZES = {
+    'small': (100, 100),
+    'medium': (400, 400),
+}
+PRODUCT_THUMBNAIL_QUALITY = env.int('PRODUCT_THUMBNAIL_QUALITY', 80)
+PRODUCT_THUMBNAILS_ASYNC = env.bool('PRODUCT_THUMBNAILS_ASYNC', True)
+
 DATABASES = {
     'default': dj_database_url.config(
         default='sqlite:////{0}'.format(os.path.join(BASE_DIR, 'db.sqlite3'))
     )
 }
 
+CACHES = {
+    'default': env.dj_cache_url('CACHE_URL', 'locmem://'),
+    'fragments': env.dj_cache_url('FRAGMENT_CACHE_URL', 'locmem://fragments?max_entries=10000'),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -122,6 +135,52 @@ INTERNAL_IPS = [
 
 YANDEX_APIKEY = os.environ['YANDEX_APIKEY']
 
+GEOCODER_BACKEND = env('GEOCODER_BACKEND', 'coordinates.geocoder.YandexGeocoder')
+GEOCODER_OPTIONS = env.json('GEOCODER_OPTIONS', {})
+GEOCODER_ASYNC = env.bool('GEOCODER_ASYNC', True)
+GEOCODER_WORKERS = env.int('GEOCODER_WORKERS', 4)
+GEOCODER_RETRY_DELAY = env.int('GEOCODER_RETRY_DELAY', 60)
+
+COORDINATE_CACHE_SIZE = env.int('COORDINATE_CACHE_SIZE', 10000)
+COORDINATE_CACHE_TTL = env.int('COORDINATE_CACHE_TTL', 3600)
+
+DISTANCE_METHOD = env('DISTANCE_METHOD', 'haversine')
+SPATIAL_INDEX_CELL_SIZE = env.float('SPATIAL_INDEX_CELL_SIZE', 0.05)
+DISPATCH_RADIUS_KM = env.float('DISPATCH_RADIUS_KM', None)
+DISPATCH_RESTAURANT_CAPACITY = env.int('DISPATCH_RESTAURANT_CAPACITY', 10)
+
+ORDERS_PAGE_SIZE = env.int('ORDERS_PAGE_SIZE', 50)
+ORDERS_STREAM_CHUNK_SIZE = env.int('ORDERS_STREAM_CHUNK_SIZE', 500)
+ORDER_IDEMPOTENCY_TTL = env.int('ORDER_IDEMPOTENCY_TTL', 24 * 60 * 60)
+ORDER_ARCHIVE_AFTER_DAYS = env.int('ORDER_ARCHIVE_AFTER_DAYS', 90)
+ORDER_ARCHIVE_BATCH_SIZE = env.int('ORDER_ARCHIVE_BATCH_SIZE', 1000)
+
+REQUEST_METRICS_BUFFER_SIZE = env.int('REQUEST_METRICS_BUFFER_SIZE', 5000)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'coordinates': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+        'foodcartapp': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+        'restaurateur.middleware': {
+            'handlers': ['console'],
+            'level': env('REQUEST_METRICS_LOG_LEVEL', 'WARNING'),
+        },
+    },
+}
+
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "assets"),
     os.path.join(BASE_DIR, "bundles"),